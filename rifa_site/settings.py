@@ -98,6 +98,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'rifas.middleware.AdminForcePasswordChangeMiddleware',
+    'rifas.middleware.DeferredEmailMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -306,6 +307,12 @@ SENDGRID_API_KEY = (os.environ.get("SENDGRID_API_KEY", "") or "").strip()
 SENDGRID_USE_API = os.environ.get("SENDGRID_USE_API", "0") == "1"
 SENDGRID_API_TIMEOUT = int(os.environ.get("SENDGRID_API_TIMEOUT", "10"))
 EMAIL_LOG_ERRORS = os.environ.get("EMAIL_LOG_ERRORS", "0") == "1"
+# Full tracebacks in those logs (noisy/slow during SendGrid outages).
+EMAIL_LOG_TRACEBACKS = os.environ.get("EMAIL_LOG_TRACEBACKS", "0") == "1"
+# With SENDGRID_USE_API, send emails with large attachments (>256KB) over SMTP instead (SMTP must be reachable).
+EMAIL_SMTP_FOR_LARGE_ATTACHMENTS = os.environ.get("EMAIL_SMTP_FOR_LARGE_ATTACHMENTS", "0") == "1"
+# Background email sender threads per process.
+EMAIL_WORKER_THREADS = int(os.environ.get("EMAIL_WORKER_THREADS", "2"))
 
 if _env_email_backend:
     EMAIL_BACKEND = _env_email_backend
@@ -331,6 +338,8 @@ PURCHASE_NOTIFY_EMAIL = os.environ.get("PURCHASE_NOTIFY_EMAIL", "")
 SEND_PURCHASE_EMAILS = os.environ.get("SEND_PURCHASE_EMAILS", "0") == "1"
 SEND_CUSTOMER_EMAILS = os.environ.get("SEND_CUSTOMER_EMAILS", "0") == "1"
 SEND_WINNER_EMAILS = os.environ.get("SEND_WINNER_EMAILS", "1") == "1"
+# With the SendGrid API, the admin notification links the proof instead of attaching it (set 1 to attach).
+SEND_ATTACH_PROOF = os.environ.get("SEND_ATTACH_PROOF", "0") == "1"
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
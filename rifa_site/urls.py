@@ -25,20 +25,26 @@ from rifas.media_views import media_serve
 from rifas import views as rifas_views
 from rifas.sitemaps import sitemaps as rifas_sitemaps
 
-urlpatterns = [
-    # Admin password recovery (must be BEFORE admin.site.urls)
-    path("admin/password-reset/", rifas_views.admin_password_reset, name="admin_password_reset"),
-    path("admin/boleto-ganador/", rifas_views.admin_winner_search, name="admin_winner_search"),
-    path("admin/calculadora-rifa/", rifas_views.admin_raffle_calculator, name="admin_raffle_calculator"),
-    path("admin/rendimiento-rifa/", rifas_views.admin_raffle_performance, name="admin_raffle_performance"),
+# Custom admin pages, grouped under a single "admin/" prefix.
+# Must be a list: include() treats any tuple as (urlconf, app_name).
+admin_extra_patterns = [
+    path("password-reset/", rifas_views.admin_password_reset, name="admin_password_reset"),
+    path("boleto-ganador/", rifas_views.admin_winner_search, name="admin_winner_search"),
+    path("calculadora-rifa/", rifas_views.admin_raffle_calculator, name="admin_raffle_calculator"),
+    path("rendimiento-rifa/", rifas_views.admin_raffle_performance, name="admin_raffle_performance"),
+]
+
+urlpatterns = (
+    # Admin password recovery etc. (must be BEFORE admin.site.urls)
+    path("admin/", include(admin_extra_patterns)),
     path('admin/', admin.site.urls),
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
     path("sitemap.xml", sitemap, {"sitemaps": rifas_sitemaps}),
     path('', include('rifas.urls')),
-]
+)
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += tuple(static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT))
 else:
     # Production: serve ONLY public media + staff-only private media.
-    urlpatterns += [path("media/<path:path>", media_serve, name="media_serve")]
\ No newline at end of file
+    urlpatterns += (path("media/<path:path>", media_serve, name="media_serve"),)
\ No newline at end of file
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rifa_site.settings')
 
 application = get_wsgi_application()
+
+# Build the URL resolver (imports + route regex compilation) at worker boot
+# instead of on the first request. Done here, not in AppConfig.ready(), so
+# management commands (migrate, collectstatic) don't pay for it.
+from django.urls import get_resolver  # noqa: E402
+
+get_resolver().reverse_dict
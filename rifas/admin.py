@@ -3,15 +3,34 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django import forms
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
-from django.utils.html import format_html
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.utils import timezone
 from django.urls import reverse
 from django.conf import settings
+import datetime
+import posixpath
 import secrets
+import tempfile
+import threading
 
+try:
+    import openpyxl  # type: ignore
+except Exception:  # optional: only needed for the customers export
+    openpyxl = None
+
+try:
+    from mutagen import File as MutagenFile  # type: ignore
+except Exception:  # optional: last-resort video duration reader
+    MutagenFile = None
+
+from .forms import PHONE_PREFIX_CHOICES
 from .models import AuditEvent, BankAccount, Customer, Raffle, RaffleCalculation, RaffleImage, RaffleOffer, SiteContent, Ticket, TicketPurchase, UserSecurity
-from django.db import models
+from django.core.paginator import Paginator
+from django.db import connections, models, transaction
+from django.utils.functional import cached_property
 
 # Admin UI (Spanish)
 admin.site.site_header = "GanaHoyRD — Administración"
@@ -52,10 +71,6 @@ class RaffleAdmin(admin.ModelAdmin):
     inlines = [RaffleImageInline, RaffleOfferInline]
     actions = ["show_in_history_action", "hide_from_history_action"]
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(sold_tickets_annot=models.Count("tickets")).prefetch_related("offers")
-
     @admin.action(description="Mostrar en historial")
     def show_in_history_action(self, request, queryset):
         queryset.update(show_in_history=True)
@@ -65,33 +80,47 @@ class RaffleAdmin(admin.ModelAdmin):
         queryset.update(show_in_history=False)
 
     def save_model(self, request, obj, form, change):
-        from .emails import send_winner_notification_sync
-        from .audit import log_event
+        from .emails import send_winner_notification_background
+        from .audit import build_event, log_event
 
         prev_winner = None
         prev_active = None
         prev_hist = None
         if change and obj.pk:
-            prev_winner, prev_active, prev_hist = (
-                Raffle.objects.filter(pk=obj.pk)
-                .values_list("winner_ticket_number", "is_active", "show_in_history")
-                .first()
-                or (None, None, None)
-            )
+            prev_fields = ("winner_ticket_number", "is_active", "show_in_history")
+            initial = getattr(form, "initial", None) or {}
+            if all(k in initial for k in prev_fields):
+                # Pre-edit values are already on the bound form: no extra SELECT.
+                prev_winner, prev_active, prev_hist = (initial[k] for k in prev_fields)
+            else:
+                prev_winner, prev_active, prev_hist = (
+                    Raffle.objects.filter(pk=obj.pk).values_list(*prev_fields).first() or (None, None, None)
+                )
 
         # Best-effort: validate raffle video duration <= 20s using metadata.
         # If it fails to read duration, we allow upload but recommend using MP4/WebM.
-        if getattr(obj, "video", None):
+        # Only a newly uploaded video needs checking (don't reopen the stored file on every save).
+        if getattr(obj, "video", None) and (not change or "video" in form.changed_data):
             try:
-                from mutagen import File as MutagenFile  # type: ignore
+                from .video_transcode import ffprobe_duration_seconds, mp4_duration_seconds
 
                 f = obj.video.file
+                # MP4/MOV: read only the moov/mvhd header.
+                length = mp4_duration_seconds(f)
                 try:
                     f.seek(0)
                 except Exception:
                     pass
-                meta = MutagenFile(f)
-                length = float(getattr(getattr(meta, "info", None), "length", 0) or 0)
+                if length is None:
+                    # Other containers: ffprobe reads just the metadata, if installed.
+                    length = ffprobe_duration_seconds(f)
+                if length is None and MutagenFile is not None:
+                    meta = MutagenFile(f)
+                    length = float(getattr(getattr(meta, "info", None), "length", 0) or 0)
+                    try:
+                        f.seek(0)
+                    except Exception:
+                        pass
                 if length and length > 20.0:
                     raise ValidationError("El video debe durar máximo 20 segundos.")
             except ValidationError:
@@ -114,12 +143,11 @@ class RaffleAdmin(admin.ModelAdmin):
             should_notify = bool(new_winner and (obj.is_active is False) and bool(obj.show_in_history) and (winner_changed or became_inactive or became_history))
 
             if should_notify:
-                t = (
-                    Ticket.objects.select_related("purchase")
-                    .filter(raffle=obj, number=int(new_winner))
-                    .order_by("-id")
-                    .first()
-                )
+                # (raffle, number) is unique: a plain index seek, no sort.
+                try:
+                    t = Ticket.objects.select_related("purchase").get(raffle=obj, number=int(new_winner))
+                except Ticket.DoesNotExist:
+                    t = None
                 purchase = getattr(t, "purchase", None) if t else None
                 if not t:
                     self.message_user(
@@ -143,25 +171,37 @@ class RaffleAdmin(admin.ModelAdmin):
                         inferred = request.build_absolute_uri("/").rstrip("/")
                     except Exception:
                         inferred = ""
-                    ok, err = send_winner_notification_sync(
-                        raffle=obj,
-                        purchase=purchase,
-                        ticket_display=obj.winner_ticket_display,
-                        site_url=(getattr(settings, "SITE_URL", "") or inferred),
-                    )
-                    log_event(
+                    site_url = getattr(settings, "SITE_URL", "") or inferred
+                    ticket_display = obj.winner_ticket_display
+                    event = build_event(
                         request=request,
                         action=AuditEvent.Action.WINNER_SET,
                         raffle=obj,
                         purchase=purchase,
                         ticket=t,
-                        notes=("Correo ganador enviado." if ok else f"Fallo correo ganador: {err}"),
-                        extra={"winner_ticket_number": int(new_winner), "email": getattr(purchase, "email", ""), "sent": ok},
+                        extra={"winner_ticket_number": int(new_winner), "email": getattr(purchase, "email", "")},
+                    )
+
+                    def _record(ok, err):
+                        event.notes = "Correo ganador enviado." if ok else f"Fallo correo ganador: {err}"
+                        event.extra["sent"] = ok
+                        event.save()
+
+                    # Send after commit, off the request; the result lands in the audit log.
+                    transaction.on_commit(
+                        lambda: send_winner_notification_background(
+                            raffle=obj,
+                            purchase=purchase,
+                            ticket_display=ticket_display,
+                            site_url=site_url,
+                            on_done=_record,
+                        )
+                    )
+                    self.message_user(
+                        request,
+                        "Correo de felicitación en camino al ganador (el resultado queda en Auditoría).",
+                        level=messages.SUCCESS,
                     )
-                    if ok:
-                        self.message_user(request, "Correo de felicitación enviado al ganador.", level=messages.SUCCESS)
-                    else:
-                        self.message_user(request, f"No se pudo enviar correo al ganador: {err}", level=messages.ERROR)
                 else:
                     self.message_user(
                         request,
@@ -178,7 +218,10 @@ class RaffleAdmin(admin.ModelAdmin):
     def ticket_counter(self, obj: Raffle):
         if not obj.max_tickets:
             return "—"
-        return f"{obj.sold_tickets}/{obj.max_tickets} ({obj.sold_percent}%)"
+        # Denormalized counter: no COUNT query for the changelist.
+        sold = int(obj.sold_tickets_cached or 0)
+        percent = min(100, sold * 100 // obj.max_tickets)
+        return f"{sold}/{obj.max_tickets} ({percent}%)"
 
     def save_formset(self, request, form, formset, change):
         """
@@ -190,17 +233,20 @@ class RaffleAdmin(admin.ModelAdmin):
             raffle: Raffle = form.instance
             cover_count = 1 if getattr(raffle, "image", None) else 0
 
-            submitted = 0
-            for f in formset.forms:
-                if not hasattr(f, "cleaned_data"):
-                    continue
-                if f.cleaned_data.get("DELETE"):
-                    continue
-                img = f.cleaned_data.get("image") or getattr(f.instance, "image", None)
-                if img:
+            limit = 3 - cover_count
+            # Existing rows are counted in the DB; only new forms are walked.
+            deleted_pks = [f.instance.pk for f in formset.deleted_forms if f.instance.pk]
+            submitted = (
+                RaffleImage.objects.filter(raffle=raffle).exclude(pk__in=deleted_pks).count()
+                if raffle.pk
+                else 0
+            )
+            for f in formset.extra_forms:
+                cleaned = getattr(f, "cleaned_data", None)
+                if cleaned and not cleaned.get("DELETE") and cleaned.get("image"):
                     submitted += 1
 
-            if cover_count + submitted > 3:
+            if submitted > limit:
                 raise ValidationError(
                     "Máximo 3 fotos por artículo (incluye la imagen principal). "
                     f"Ahora mismo: principal={cover_count}, galería={submitted}."
@@ -211,67 +257,133 @@ class RaffleAdmin(admin.ModelAdmin):
 
 @admin.action(description="Aprobar compras seleccionadas")
 def approve_purchases(modeladmin, request, queryset):
-    from .emails import send_customer_purchase_status
-    from .audit import log_event
-
-    for purchase in queryset.select_related("raffle"):
-        prev_status = purchase.status
-        try:
-            purchase.approve()
-            log_event(
+    from .emails import send_customer_purchase_status_bulk
+    from .audit import build_event, log_events
+
+    # defer(None): the changelist queryset only loads the listed columns.
+    purchases = list(queryset.defer(None).select_related("raffle"))
+    prev_statuses = {p.pk: p.status for p in purchases}
+    # Batched approval: one UPDATE + one ticket INSERT instead of per-row saves.
+    # Approvals and the rejections they cause commit together.
+    with transaction.atomic():
+        approved, failed = TicketPurchase.bulk_approve(purchases)
+        rejected = TicketPurchase.bulk_reject([p for p, _ in failed], notes=[error for _, error in failed])
+
+    log_events(
+        [
+            build_event(
                 request=request,
                 action=AuditEvent.Action.PURCHASE_APPROVED,
                 raffle=purchase.raffle,
                 purchase=purchase,
-                from_status=prev_status,
+                from_status=prev_statuses.get(purchase.pk, ""),
                 to_status=purchase.status,
             )
-            try:
-                send_customer_purchase_status(purchase=purchase)
-            except Exception:
-                pass
-        except ValueError as e:
-            purchase.reject(notes=str(e))
-            log_event(
+            for purchase in approved
+        ]
+        + [
+            build_event(
                 request=request,
                 action=AuditEvent.Action.PURCHASE_REJECTED,
                 raffle=purchase.raffle,
                 purchase=purchase,
-                from_status=prev_status,
+                from_status=prev_statuses.get(purchase.pk, ""),
                 to_status=purchase.status,
-                notes=str(e),
-            )
-            try:
-                send_customer_purchase_status(purchase=purchase)
-            except Exception:
-                pass
-            modeladmin.message_user(
-                request,
-                f"Compra #{purchase.id} rechazada: {e}",
-                level=messages.WARNING,
+                notes=purchase.admin_notes,
             )
+            for purchase in rejected
+        ]
+    )
+
+    try:
+        send_customer_purchase_status_bulk(purchases=approved + rejected)
+    except Exception:
+        pass
+    for purchase, error in failed:
+        modeladmin.message_user(
+            request,
+            f"Compra #{purchase.id} rechazada: {error}",
+            level=messages.WARNING,
+        )
 
 
 @admin.action(description="Rechazar compras seleccionadas")
 def reject_purchases(modeladmin, request, queryset):
-    from .emails import send_customer_purchase_status
-    from .audit import log_event
-
-    for purchase in queryset.select_related("raffle"):
-        prev_status = purchase.status
-        purchase.reject()
-        log_event(
-            request=request,
-            action=AuditEvent.Action.PURCHASE_REJECTED,
-            raffle=purchase.raffle,
-            purchase=purchase,
-            from_status=prev_status,
-            to_status=purchase.status,
-        )
+    from .emails import send_customer_purchase_status_bulk
+    from .audit import build_event, log_events
+
+    purchases = list(queryset.defer(None).select_related("raffle"))
+    prev_statuses = {p.pk: p.status for p in purchases}
+    # One UPDATE and one audit INSERT for the whole selection.
+    TicketPurchase.bulk_reject(purchases)
+    log_events(
+        [
+            build_event(
+                request=request,
+                action=AuditEvent.Action.PURCHASE_REJECTED,
+                raffle=purchase.raffle,
+                purchase=purchase,
+                from_status=prev_statuses.get(purchase.pk, ""),
+                to_status=purchase.status,
+            )
+            for purchase in purchases
+        ]
+    )
+    try:
+        send_customer_purchase_status_bulk(purchases=purchases)
+    except Exception:
+        pass
+
+
+def _is_changelist(request) -> bool:
+    match = getattr(request, "resolver_match", None)
+    return bool(match and (match.url_name or "").endswith("_changelist"))
+
+
+# Proof link markup, %-formatted with an escaped URL (cheaper than format_html per row).
+_PROOF_LINK_TMPL = '<a href="%s" target="_blank" rel="noopener">Ver</a>'
+_PROOF_PREVIEW_TMPL = (
+    '<a href="%s" target="_blank" rel="noopener">'
+    '<img src="%s" alt="comprobante" style="max-width:360px; width:100%%; border-radius:12px; border:1px solid rgba(255,255,255,.15);" />'
+    "</a>"
+)
+
+
+# Per-request memo for changelist display callables (they only receive `obj`).
+# Set by TicketPurchaseAdmin.changelist_view; thread-local so gunicorn threads don't share it.
+_changelist_memo = threading.local()
+
+
+class ApproxCountPaginator(Paginator):
+    """
+    Uses the MySQL table statistics for unfiltered changelists instead of COUNT(*).
+    Falls back to an exact count for filtered querysets, small tables and other backends.
+    """
+
+    EXACT_BELOW = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        query = getattr(qs, "query", None)
+        if query is None or query.where:
+            return super().count
         try:
-            send_customer_purchase_status(purchase=purchase)
+            conn = connections[qs.db]
+            if conn.vendor != "mysql":
+                return super().count
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [qs.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            estimate = int(row[0] or 0) if row else 0
         except Exception:
-            pass
+            return super().count
+        if estimate < self.EXACT_BELOW:
+            return super().count
+        return estimate
 
 
 class PhonePrefixFilter(admin.SimpleListFilter):
@@ -279,17 +391,20 @@ class PhonePrefixFilter(admin.SimpleListFilter):
     parameter_name = "phone_prefix"
 
     def lookups(self, request, model_admin):
-        return [("809", "809"), ("829", "829"), ("849", "849")]
+        return PHONE_PREFIX_CHOICES
 
     def queryset(self, request, queryset):
         val = self.value()
         if not val:
             return queryset
-        return queryset.filter(phone__startswith=val)
+        # Indexed equality on the generated column instead of a LIKE 'xxx%' scan.
+        return queryset.filter(phone_prefix=val)
 
 
 @admin.register(TicketPurchase)
 class TicketPurchaseAdmin(admin.ModelAdmin):
+    paginator = ApproxCountPaginator
+    show_full_result_count = False
     list_display = (
         "id",
         "raffle",
@@ -308,7 +423,10 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
     list_filter = ("status", "raffle", "bank_account", PhonePrefixFilter)
     search_fields = ("full_name", "phone", "email", "raffle__title", "bank_account__bank_name", "bank_account__account_number")
     search_help_text = "Busca por teléfono, nombre, rifa o banco."
-    list_select_related = ("raffle", "bank_account")
+    # AJAX pickers instead of rendering every raffle/bank as an <option>.
+    autocomplete_fields = ("raffle", "bank_account")
+    # bank_account is prefetched in get_queryset: a handful of banks, no need to join them per row.
+    list_select_related = ("raffle",)
     readonly_fields = (
         "created_at",
         "decided_at",
@@ -321,10 +439,55 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
         "proof_preview",
     )
     actions = [approve_purchases, reject_purchases]
+    changelist_fields = (
+        "id",
+        "raffle",
+        "raffle__title",
+        "bank_account",
+        "full_name",
+        "phone",
+        "quantity",
+        "bonus_quantity",
+        "total_tickets",
+        "total_amount",
+        "proof_image",
+        "status",
+        "created_at",
+    )
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # Only the listed columns (raffle: just the title for its __str__);
+            # the change form loads the rest.
+            qs = qs.only(*self.changelist_fields).prefetch_related("bank_account")
+        # One query for the active offers of all listed raffles (promo_preview).
+        # raffle is joined so the prefetch doesn't need its own raffle query
+        # outside the changelist (change form, actions).
+        return qs.select_related("raffle").prefetch_related(
+            models.Prefetch(
+                "raffle__offers",
+                queryset=RaffleOffer.active_queryset(),
+                to_attr="active_offers_prefetch",
+            )
+        )
+
+    def _active_offer(self, obj: TicketPurchase):
+        """
+        Active offer for the purchase's raffle, resolved once per raffle per changelist.
+        """
+        if not obj.raffle_id:
+            return None
+        memo = getattr(_changelist_memo, "offers", None)
+        if memo is None:
+            return obj.raffle.get_active_offer()
+        if obj.raffle_id not in memo:
+            memo[obj.raffle_id] = obj.raffle.get_active_offer()
+        return memo[obj.raffle_id]
 
     @admin.display(description="Promoción (vista previa)")
     def promo_preview(self, obj: TicketPurchase):
-        offer = obj.raffle.get_active_offer() if obj.raffle_id else None
+        offer = self._active_offer(obj)
         if not offer:
             return "—"
         est = offer.bonus_for(obj.quantity) if obj.quantity else 0
@@ -332,6 +495,52 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
             return f"{offer.buy_quantity}+{offer.bonus_quantity} (gratis estimado: {est})"
         return f"{offer.buy_quantity}+{offer.bonus_quantity}"
 
+    def changelist_view(self, request, extra_context=None):
+        _changelist_memo.proof_dirs = {}
+        _changelist_memo.offers = {}
+        _changelist_memo.urls = {}
+        try:
+            response = super().changelist_view(request, extra_context)
+            # Render now so list_display callables run while the memo is set.
+            if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                response.render()
+            return response
+        finally:
+            _changelist_memo.__dict__.clear()
+
+    def _proof_exists(self, f) -> bool:
+        """
+        Remote storage on the changelist: one listdir() per folder instead of one
+        network round-trip per row. Local disk, or elsewhere: plain exists().
+        """
+        dirs = getattr(_changelist_memo, "proof_dirs", None)
+        # payments/ is one flat folder of every proof ever uploaded: listing it costs more
+        # than the page's stat() calls on local disk.
+        if dirs is None or isinstance(f.storage, FileSystemStorage):
+            return f.storage.exists(f.name)
+        dirname, basename = posixpath.split(f.name)
+        if dirname not in dirs:
+            try:
+                dirs[dirname] = set(f.storage.listdir(dirname)[1])
+            except Exception:
+                dirs[dirname] = None
+        names = dirs[dirname]
+        if names is None:
+            return f.storage.exists(f.name)
+        return basename in names
+
+    def _proof_url(self, f) -> str:
+        """
+        f.url, memoized per file on the changelist (remote storages may sign each URL).
+        """
+        urls = getattr(_changelist_memo, "urls", None)
+        if urls is None:
+            return f.url
+        key = (f.storage.__class__.__name__, f.name)
+        if key not in urls:
+            urls[key] = f.url
+        return urls[key]
+
     @admin.display(description="Comprobante")
     def proof_link(self, obj: TicketPurchase):
         f = getattr(obj, "proof_image", None)
@@ -340,12 +549,12 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
         try:
             # If the DB points to a missing file (common on Railway without a Volume),
             # don't show a broken link.
-            if not f.storage.exists(f.name):
+            if not self._proof_exists(f):
                 return "No disponible"
-            url = f.url
+            url = self._proof_url(f)
         except Exception:
             return "No disponible"
-        return format_html('<a href="{}" target="_blank" rel="noopener">Ver</a>', url)
+        return mark_safe(_PROOF_LINK_TMPL % escape(url))
 
     @admin.display(description="Vista previa del comprobante")
     def proof_preview(self, obj: TicketPurchase):
@@ -353,47 +562,77 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
         if not f or not getattr(f, "name", ""):
             return "—"
         try:
-            if not f.storage.exists(f.name):
+            if not self._proof_exists(f):
                 return "No disponible"
-            url = f.url
+            url = self._proof_url(f)
         except Exception:
             return "No disponible"
-        return format_html(
-            '<a href="{0}" target="_blank" rel="noopener">'
-            '<img src="{0}" alt="comprobante" style="max-width:360px; width:100%; border-radius:12px; border:1px solid rgba(255,255,255,.15);" />'
-            "</a>",
-            url,
-        )
+        url = escape(url)
+        return mark_safe(_PROOF_PREVIEW_TMPL % (url, url))
+
+    # Written by the approval itself (status, offer, decision); an admin who lost the
+    # approval race must not save stale copies of them.
+    _APPROVAL_FIELDS = ("status", "bonus_quantity", "total_tickets", "total_amount", "decided_at")
+
+    def _save_over_concurrent_approval(self, obj: TicketPurchase, form) -> None:
+        """
+        The purchase was approved by someone else meanwhile: keep their approval and
+        write only the fields this admin actually edited.
+        """
+        obj.refresh_from_db(fields=self._APPROVAL_FIELDS)
+        model_fields = {f.name for f in obj._meta.concrete_fields}
+        edited = [f for f in form.changed_data if f in model_fields and f not in self._APPROVAL_FIELDS]
+        if "quantity" in edited:
+            # TicketPurchase.save() recomputes these from quantity.
+            edited += ["total_amount", "total_tickets"]
+        if edited:
+            obj.save(update_fields=edited)
 
     def save_model(self, request, obj, form, change):
         from .emails import send_customer_purchase_status
         from .audit import log_event
 
-        prev_status = None
-        if change and obj.pk:
-            prev_status = TicketPurchase.objects.filter(pk=obj.pk).values_list("status", flat=True).first()
-        super().save_model(request, obj, form, change)
-        if obj.status == TicketPurchase.Status.APPROVED and prev_status != TicketPurchase.Status.APPROVED:
-            try:
+        with transaction.atomic():
+            prev_status = (getattr(form, "initial", None) or {}).get("status") if change else None
+            became_approved = obj.status == TicketPurchase.Status.APPROVED and prev_status != TicketPurchase.Status.APPROVED
+            saved = False
+            if became_approved and change and obj.pk:
+                # Compare-and-swap instead of a locked read: only one of two admins
+                # approving the same purchase at once flips the row (and generates tickets).
+                became_approved = bool(
+                    TicketPurchase.objects.filter(pk=obj.pk)
+                    .exclude(status=TicketPurchase.Status.APPROVED)
+                    .update(status=TicketPurchase.Status.APPROVED)
+                )
+                if not became_approved:
+                    # form.initial was stale: someone else approved it already.
+                    prev_status = TicketPurchase.Status.APPROVED
+                    self._save_over_concurrent_approval(obj, form)
+                    saved = True
+            if became_approved:
+                # Offer applied before the save so the one UPDATE also writes the bonus fields.
                 obj.apply_offer()
-                obj.save(update_fields=["bonus_quantity", "total_tickets"])
-                obj.generate_tickets_if_needed()
+            if not saved:
+                super().save_model(request, obj, form, change)
+            if became_approved:
                 try:
-                    send_customer_purchase_status(purchase=obj)
-                except Exception:
-                    pass
-            except ValueError as e:
-                obj.reject(notes=str(e))
-                self.message_user(request, f"No se pudo aprobar: {e}", level=messages.ERROR)
+                    obj.generate_tickets_if_needed()
+                    try:
+                        send_customer_purchase_status(purchase=obj)
+                    except Exception:
+                        pass
+                except ValueError as e:
+                    obj.reject(notes=str(e))
+                    self.message_user(request, f"No se pudo aprobar: {e}", level=messages.ERROR)
+                    try:
+                        send_customer_purchase_status(purchase=obj)
+                    except Exception:
+                        pass
+            elif obj.status == TicketPurchase.Status.REJECTED and prev_status != TicketPurchase.Status.REJECTED:
                 try:
                     send_customer_purchase_status(purchase=obj)
                 except Exception:
                     pass
-        elif obj.status == TicketPurchase.Status.REJECTED and prev_status != TicketPurchase.Status.REJECTED:
-            try:
-                send_customer_purchase_status(purchase=obj)
-            except Exception:
-                pass
 
         # Audit status changes via manual edit.
         try:
@@ -419,36 +658,45 @@ class TicketPurchaseAdmin(admin.ModelAdmin):
             pass
 
     def delete_model(self, request, obj):
-        from .audit import log_event
+        from .audit import build_event, log_events
 
         try:
-            log_event(
-                request=request,
-                action=AuditEvent.Action.PURCHASE_DELETED,
-                raffle=obj.raffle,
-                purchase=obj,
-                from_status=getattr(obj, "status", "") or "",
-                to_status="deleted",
-                notes="Eliminado desde admin.",
+            # Written now: the row must still exist when the event is inserted.
+            log_events(
+                [
+                    build_event(
+                        request=request,
+                        action=AuditEvent.Action.PURCHASE_DELETED,
+                        raffle=obj.raffle,
+                        purchase=obj,
+                        from_status=getattr(obj, "status", "") or "",
+                        to_status="deleted",
+                        notes="Eliminado desde admin.",
+                    )
+                ]
             )
         except Exception:
             pass
         return super().delete_model(request, obj)
 
     def delete_queryset(self, request, queryset):
-        from .audit import log_event
+        from .audit import build_event, log_events
 
         try:
-            for p in queryset.select_related("raffle"):
-                log_event(
-                    request=request,
-                    action=AuditEvent.Action.PURCHASE_DELETED,
-                    raffle=p.raffle,
-                    purchase=p,
-                    from_status=getattr(p, "status", "") or "",
-                    to_status="deleted",
-                    notes="Eliminado en lote desde admin.",
-                )
+            log_events(
+                [
+                    build_event(
+                        request=request,
+                        action=AuditEvent.Action.PURCHASE_DELETED,
+                        raffle=p.raffle,
+                        purchase=p,
+                        from_status=getattr(p, "status", "") or "",
+                        to_status="deleted",
+                        notes="Eliminado en lote desde admin.",
+                    )
+                    for p in queryset.select_related("raffle")
+                ]
+            )
         except Exception:
             pass
         return super().delete_queryset(request, queryset)
@@ -467,6 +715,13 @@ class SiteContentAdmin(admin.ModelAdmin):
         ("CEO / Contacto", {"fields": ("ceo_name", "ceo_phone", "ceo_instagram_url", "ceo_tiktok_url")}),
     )
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # The list only shows updated_at; skip the long text bodies.
+            qs = qs.defer("about_body", "policy_body", "payment_body", "terms_body")
+        return qs
+
 
 @admin.register(BankAccount)
 class BankAccountAdmin(admin.ModelAdmin):
@@ -475,11 +730,13 @@ class BankAccountAdmin(admin.ModelAdmin):
     search_fields = ("bank_name", "account_number")
 
 
+# Export only customer profile data (no purchase metrics)
+CUSTOMER_XLSX_HEADERS = ("Nombre", "Teléfono", "Email", "Creado", "Actualizado")
+
+
 @admin.action(description="Exportar a Excel (.xlsx)")
 def export_customers_xlsx(modeladmin, request, queryset):
-    try:
-        import openpyxl  # type: ignore
-    except Exception:
+    if openpyxl is None:
         modeladmin.message_user(
             request,
             "Falta la dependencia openpyxl para exportar a Excel.",
@@ -487,31 +744,41 @@ def export_customers_xlsx(modeladmin, request, queryset):
         )
         return None
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Clientes"
+    # write_only streams rows to disk instead of keeping every cell in memory.
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Clientes")
 
-    # Export only customer profile data (no purchase metrics)
-    headers = ["Nombre", "Teléfono", "Email", "Creado", "Actualizado"]
-    ws.append(headers)
+    ws.append(CUSTOMER_XLSX_HEADERS)
 
-    for c in queryset.order_by("-last_purchase_at", "-updated_at").iterator(chunk_size=1000):
+    # Plain tuples: no model instantiation per exported row.
+    rows = (
+        queryset.order_by("-last_purchase_at", "-updated_at")
+        .values_list("full_name", "phone", "email", "created_at", "updated_at")
+        .iterator(chunk_size=2000)
+    )
+    # Bound once instead of an attribute lookup per cell.
+    isoformat = datetime.datetime.isoformat
+    for full_name, phone, email, created_at, updated_at in rows:
         ws.append(
-            [
-                c.full_name,
-                c.phone,
-                c.email,
-                c.created_at.isoformat(sep=" ", timespec="seconds") if c.created_at else "",
-                c.updated_at.isoformat(sep=" ", timespec="seconds") if c.updated_at else "",
-            ]
+            (
+                full_name,
+                phone,
+                email,
+                isoformat(created_at, " ", "seconds") if created_at else "",
+                isoformat(updated_at, " ", "seconds") if updated_at else "",
+            )
         )
 
-    resp = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    # Spool to a temp file and stream it (FileResponse closes it when done).
+    tmp = tempfile.TemporaryFile(suffix=".xlsx")
+    wb.save(tmp)
+    tmp.seek(0)
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename="clientes_ganahoyrd.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    resp["Content-Disposition"] = 'attachment; filename="clientes_ganahoyrd.xlsx"'
-    wb.save(resp)
-    return resp
 
 
 @admin.register(Customer)
@@ -521,6 +788,13 @@ class CustomerAdmin(admin.ModelAdmin):
     list_filter = ("created_at",)
     actions = [export_customers_xlsx]
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # Fetch only the listed columns (the change form loads everything).
+            qs = qs.only(*self.list_display)
+        return qs
+
     def has_add_permission(self, request):
         # Customers are created/updated automatically from purchases.
         # Hide "Añadir cliente" to avoid confusion.
@@ -529,12 +803,16 @@ class CustomerAdmin(admin.ModelAdmin):
 
 @admin.register(Ticket)
 class TicketAdmin(admin.ModelAdmin):
+    paginator = ApproxCountPaginator
+    show_full_result_count = False
     list_display = ("raffle", "number_display", "purchase", "created_at")
     list_filter = ("raffle",)
     search_fields = ("purchase__full_name", "purchase__phone", "purchase__email", "raffle__title")
-    list_select_related = ("raffle", "purchase")
+    # purchase__raffle: TicketPurchase.__str__ renders the raffle title.
+    list_select_related = ("raffle", "purchase", "purchase__raffle")
     readonly_fields = ("number_display", "created_at")
     fields = ("raffle", "purchase", "number", "number_display", "created_at")
+    autocomplete_fields = ("raffle", "purchase")
 
     @admin.display(description="Boleto")
     def number_display(self, obj: Ticket):
@@ -544,47 +822,63 @@ class TicketAdmin(admin.ModelAdmin):
         qs, use_distinct = super().get_search_results(request, queryset, search_term)
         term = (search_term or "").strip()
         digits = "".join(ch for ch in term if ch.isdigit())
+        # Build the extra predicates as one Q so a single OR clause is added.
+        extra = models.Q()
         # Search by ticket number (accept 001/0001/etc.)
         if digits:
             try:
-                n = int(digits)
-                qs = qs | queryset.filter(number=n)
+                extra |= models.Q(number=int(digits))
             except Exception:
                 pass
-        # Search by phone digits (ignore separators)
-        if len(digits) >= 7:
-            qs = qs | queryset.filter(purchase__phone__icontains=digits)
-        return qs, use_distinct
+        # Search by phone digits (ignore separators). Phones are stored as
+        # prefix + 7 digits, so a full number can use the phone index.
+        if len(digits) == 10:
+            extra |= models.Q(purchase__phone=digits)
+        elif len(digits) >= 7:
+            extra |= models.Q(purchase__phone__icontains=digits)
+        if extra:
+            qs = qs | queryset.filter(extra)
+        # Keep the join hints on the combined queryset.
+        return qs.select_related(*self.list_select_related), use_distinct
 
     def delete_model(self, request, obj):
-        from .audit import log_event
+        from .audit import build_event, log_events
 
         try:
-            log_event(
-                request=request,
-                action=AuditEvent.Action.TICKET_DELETED,
-                raffle=obj.raffle,
-                purchase=getattr(obj, "purchase", None),
-                ticket=obj,
-                notes=f"Eliminado boleto #{obj.display_number}.",
+            # Written now: the row must still exist when the event is inserted.
+            log_events(
+                [
+                    build_event(
+                        request=request,
+                        action=AuditEvent.Action.TICKET_DELETED,
+                        raffle=obj.raffle,
+                        purchase=getattr(obj, "purchase", None),
+                        ticket=obj,
+                        notes=f"Eliminado boleto #{obj.display_number}.",
+                    )
+                ]
             )
         except Exception:
             pass
         return super().delete_model(request, obj)
 
     def delete_queryset(self, request, queryset):
-        from .audit import log_event
+        from .audit import build_event, log_events
 
         try:
-            for t in queryset.select_related("raffle", "purchase"):
-                log_event(
-                    request=request,
-                    action=AuditEvent.Action.TICKET_DELETED,
-                    raffle=t.raffle,
-                    purchase=getattr(t, "purchase", None),
-                    ticket=t,
-                    notes=f"Eliminado en lote boleto #{t.display_number}.",
-                )
+            log_events(
+                [
+                    build_event(
+                        request=request,
+                        action=AuditEvent.Action.TICKET_DELETED,
+                        raffle=t.raffle,
+                        purchase=getattr(t, "purchase", None),
+                        ticket=t,
+                        notes=f"Eliminado en lote boleto #{t.display_number}.",
+                    )
+                    for t in queryset.select_related("raffle", "purchase")
+                ]
+            )
         except Exception:
             pass
         return super().delete_queryset(request, queryset)
@@ -592,6 +886,8 @@ class TicketAdmin(admin.ModelAdmin):
 
 @admin.register(AuditEvent)
 class AuditEventAdmin(admin.ModelAdmin):
+    paginator = ApproxCountPaginator
+    show_full_result_count = False
     list_display = ("created_at", "action", "actor", "raffle", "purchase", "ticket", "from_status", "to_status", "ip")
     list_filter = ("action", "created_at", "actor", "raffle")
     search_fields = ("purchase__public_reference", "purchase__full_name", "purchase__phone", "purchase__email", "ip", "user_agent")
@@ -610,6 +906,15 @@ class AuditEventAdmin(admin.ModelAdmin):
         "user_agent",
     )
     fields = readonly_fields
+    # Purchase/Ticket __str__ render the raffle title.
+    list_select_related = ("actor", "raffle", "purchase", "purchase__raffle", "ticket", "ticket__raffle")
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            # Large columns only shown on the detail page.
+            qs = qs.defer("notes", "extra", "user_agent")
+        return qs
 
     def has_add_permission(self, request):
         return False
@@ -678,15 +983,11 @@ class UserSecurityInline(admin.StackedInline):
     verbose_name_plural = "Seguridad"
 
 
-# Extend Django's User admin to include "force password change"
+# Extend Django's User admin to include "force password change".
+# Registered in RifasConfig.ready() (after every app's admin was autodiscovered).
 User = get_user_model()
-try:
-    admin.site.unregister(User)
-except admin.sites.NotRegistered:
-    pass
 
 
-@admin.register(User)
 class UserAdmin(DjangoUserAdmin):
     inlines = (UserSecurityInline,)
 
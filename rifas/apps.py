@@ -8,3 +8,18 @@ class RifasConfig(AppConfig):
 
     def ready(self):
         from . import signals  # noqa: F401
+
+        self._register_user_admin()
+
+    @staticmethod
+    def _register_user_admin():
+        """
+        Swap Django's User admin for ours once at startup, independent of app order.
+        """
+        from django.contrib import admin
+
+        from .admin import User, UserAdmin
+
+        if admin.site.is_registered(User):
+            admin.site.unregister(User)
+        admin.site.register(User, UserAdmin)
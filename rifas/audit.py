@@ -1,23 +1,36 @@
 from __future__ import annotations
 
+from django.db import transaction
 from django.http import HttpRequest
 
 from .models import AuditEvent, Raffle, Ticket, TicketPurchase
 
 
 def _client_ip(request: HttpRequest) -> str:
-    return (
-        (request.META.get("HTTP_X_REAL_IP") or "")
-        or (request.META.get("HTTP_X_FORWARDED_FOR") or "").split(",")[0].strip()
-        or (request.META.get("REMOTE_ADDR") or "")
-    )[:64]
+    # Memoized on the request: several events can be logged per request.
+    ip = getattr(request, "_audit_ip", None)
+    if ip is not None:
+        return ip
+    meta = request.META
+    if v := meta.get("HTTP_X_REAL_IP"):
+        ip = v
+    elif v := meta.get("HTTP_X_FORWARDED_FOR"):
+        ip = v.split(",", 1)[0].strip() or meta.get("REMOTE_ADDR") or ""
+    else:
+        ip = meta.get("REMOTE_ADDR") or ""
+    ip = ip[:64]
+    request._audit_ip = ip
+    return ip
 
 
 def _user_agent(request: HttpRequest) -> str:
-    return (request.META.get("HTTP_USER_AGENT") or "")[:255]
+    ua = getattr(request, "_audit_ua", None)
+    if ua is None:
+        ua = request._audit_ua = (request.META.get("HTTP_USER_AGENT") or "")[:255]
+    return ua
 
 
-def log_event(
+def build_event(
     *,
     request: HttpRequest,
     action: str,
@@ -28,24 +41,52 @@ def log_event(
     to_status: str = "",
     notes: str = "",
     extra: dict | None = None,
-) -> None:
+) -> AuditEvent:
+    """
+    Unsaved AuditEvent for the given request (see log_event / log_events).
+    """
+    user = getattr(request, "user", None)
+    # Only pass what was given; the model defaults ("" / {} / NULL) cover the rest.
+    optional = {
+        "actor": user if user and user.is_authenticated else None,
+        "raffle": raffle,
+        "purchase": purchase,
+        "ticket": ticket,
+        "from_status": from_status,
+        "to_status": to_status,
+        "notes": notes,
+        "extra": extra,
+    }
+    return AuditEvent(
+        action=action,
+        ip=_client_ip(request),
+        user_agent=_user_agent(request),
+        **{k: v for k, v in optional.items() if v},
+    )
+
+
+def log_event(**kwargs) -> None:
     """
     Best-effort audit log (never throws).
+    Queued after commit and written in batches by audit_worker; for events about
+    rows that are about to be deleted use log_events(), which writes immediately.
     """
     try:
-        AuditEvent.objects.create(
-            actor=getattr(request, "user", None) if getattr(request, "user", None) and request.user.is_authenticated else None,
-            action=action,
-            raffle=raffle,
-            purchase=purchase,
-            ticket=ticket,
-            from_status=from_status or "",
-            to_status=to_status or "",
-            notes=notes or "",
-            extra=extra or {},
-            ip=_client_ip(request),
-            user_agent=_user_agent(request),
-        )
+        from . import audit_worker
+
+        event = build_event(**kwargs)
+        transaction.on_commit(lambda: audit_worker.enqueue(event))
     except Exception:
         return
 
+
+def log_events(events: list[AuditEvent]) -> None:
+    """
+    Best-effort batch insert of events built with build_event (never throws).
+    """
+    if not events:
+        return
+    try:
+        AuditEvent.objects.bulk_create(events, batch_size=500)
+    except Exception:
+        return
@@ -0,0 +1,127 @@
+"""
+Background writer for audit events: log_event() queues unsaved AuditEvents and a
+daemon thread inserts them in batches, so audit INSERTs stay off the request path.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections
+
+from .models import AuditEvent
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+# Wait this long for more events before writing a partial batch.
+BATCH_WAIT_SECONDS = 0.5
+# Backpressure: past this many pending events, callers write synchronously.
+MAX_PENDING = 10000
+
+_queue: queue.Queue[AuditEvent] = queue.Queue(maxsize=MAX_PENDING)
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+# Nullable FKs that may point at rows deleted before the batch is written.
+_FK_FIELDS = ("actor", "raffle", "purchase", "ticket")
+
+
+def _detach_deleted_refs(batch: list[AuditEvent]) -> None:
+    """
+    Null FKs whose target was deleted meanwhile (as SET_NULL would have), keeping the
+    old id in extra so the event still says what it was about.
+    """
+    for name in _FK_FIELDS:
+        field = AuditEvent._meta.get_field(name)
+        attname = field.attname
+        ids = {getattr(e, attname) for e in batch if getattr(e, attname) is not None}
+        if not ids:
+            continue
+        existing = set(field.related_model._default_manager.filter(pk__in=ids).values_list("pk", flat=True))
+        for e in batch:
+            pk = getattr(e, attname)
+            if pk is not None and pk not in existing:
+                # Through the descriptor: also drops the cached (deleted) instance, which
+                # save/bulk_create would otherwise reject or copy the old id back from.
+                setattr(e, name, None)
+                e.extra = {**(e.extra or {}), f"{name}_id": pk}
+
+
+def _write(batch: list[AuditEvent]) -> None:
+    try:
+        _detach_deleted_refs(batch)
+        AuditEvent.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        return
+    except Exception as e:
+        logger.warning("Audit batch insert failed (%s events), retrying one by one: %s", len(batch), e)
+    # One bad row must not cost the rest of the batch.
+    for event in batch:
+        try:
+            event.save(force_insert=True)
+        except Exception as e:
+            logger.error(
+                "Audit event lost (action=%s, purchase=%s, raffle=%s): %s",
+                event.action,
+                event.purchase_id,
+                event.raffle_id,
+                e,
+            )
+
+
+def _drain(batch: list[AuditEvent], timeout: float) -> None:
+    while len(batch) < BATCH_SIZE:
+        try:
+            batch.append(_queue.get(timeout=timeout))
+        except queue.Empty:
+            return
+
+
+def _run() -> None:
+    while True:
+        batch = [_queue.get()]
+        _drain(batch, BATCH_WAIT_SECONDS)
+        close_old_connections()
+        _write(batch)
+
+
+def _ensure_thread() -> None:
+    global _thread
+    # Started lazily (not in AppConfig.ready) so it lives in the serving process,
+    # not in a pre-fork master or in management commands.
+    if _thread is not None and _thread.is_alive():
+        return
+    with _lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, name="audit-writer", daemon=True)
+            _thread.start()
+
+
+def enqueue(event: AuditEvent) -> None:
+    _ensure_thread()
+    try:
+        _queue.put_nowait(event)
+    except queue.Full:
+        _write([event])
+
+
+def flush() -> None:
+    """
+    Write whatever is still queued (on interpreter exit).
+    """
+    batch: list[AuditEvent] = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _write(batch)
+
+
+atexit.register(flush)
@@ -1,19 +1,64 @@
 from __future__ import annotations
 
+import time
+
 from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
 
 from .models import SiteContent
 
 
+SITE_CONTENT_VERSION_KEY = "site_content_ver"
+# How often a process asks the cache whether SiteContent changed.
+_VERSION_CHECK_SECONDS = 5.0
+# Re-fetch at least this often whatever the version says: without REDIS_URL the cache
+# is per-process LocMem, so a bump only reaches the process that saved SiteContent.
+_MAX_LOCAL_AGE_SECONDS = 60.0
+
+# Process-local copy: {"site": SiteContent | None, "ver": version,
+# "checked": / "loaded": monotonic time}.
+_local = {"site": None, "ver": None, "checked": 0.0, "loaded": 0.0}
+
+
+def _current_version():
+    ver = cache.get(SITE_CONTENT_VERSION_KEY)
+    if ver is None:
+        # Key evicted / first boot: seed it (add() keeps a value set by another process).
+        cache.add(SITE_CONTENT_VERSION_KEY, time.time_ns(), None)
+        ver = cache.get(SITE_CONTENT_VERSION_KEY)
+    return ver
+
+
+def bump_site_content_version() -> None:
+    """
+    Invalidate the cached copies (called after SiteContent is saved/deleted): every
+    process with a shared cache (Redis), otherwise this one (others within _MAX_LOCAL_AGE_SECONDS).
+    """
+    cache.set(SITE_CONTENT_VERSION_KEY, time.time_ns(), None)
+    _local["checked"] = 0.0
+
+
+def _get_site() -> SiteContent:
+    now = time.monotonic()
+    if _local["site"] is None or now - _local["checked"] >= _VERSION_CHECK_SECONDS:
+        ver = _current_version()
+        if (
+            _local["site"] is None
+            or ver is None
+            or ver != _local["ver"]
+            or now - _local["loaded"] >= _MAX_LOCAL_AGE_SECONDS
+        ):
+            _local["site"] = SiteContent.get_solo()
+            _local["ver"] = ver
+            _local["loaded"] = now
+        _local["checked"] = now
+    return _local["site"]
+
+
 def site_content(request):
     """
     Provide SiteContent globally to templates as `site`.
-    Cached to avoid a DB hit on every request.
+    Kept in process memory; the cache only holds a version number, checked at most
+    every few seconds, and the copy is re-fetched at least once a minute. Lazy: nothing runs unless a template uses `site`.
     """
-    key = "site_content_solo_v1"
-    site = cache.get(key)
-    if site is None:
-        site = SiteContent.get_solo()
-        cache.set(key, site, 60)  # 60s cache
-    return {"site": site}
-
+    return {"site": SimpleLazyObject(_get_site)}
@@ -1,30 +1,106 @@
 from __future__ import annotations
 
+import atexit
+from dataclasses import dataclass
 from email.utils import parseaddr
+from functools import lru_cache
 import mimetypes
+import os
+import queue
 import threading
+import time
 import base64
 import json
 import logging
-import urllib.request
-import urllib.error
+import http.client
 
 from django.conf import settings
-from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.core.signals import request_finished, setting_changed
+from django.db import connections
+from django.dispatch import receiver
 from django.utils import timezone
 
-from .models import TicketPurchase
+from .models import Ticket, TicketPurchase
 
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson  # type: ignore
 
+    _json_bytes = orjson.dumps
+except Exception:  # optional: faster encoder for the SendGrid payloads
+
+    def _json_bytes(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class _EmailSettings:
+    use_sendgrid_api: bool
+    sendgrid_api_key: str
+    sendgrid_api_timeout: int
+    default_from_email: str
+    log_errors: bool
+    log_tracebacks: bool
+    send_purchase_emails: bool
+    send_customer_emails: bool
+    send_winner_emails: bool
+    attach_proof: bool
+    smtp_for_large_attachments: bool
+    worker_threads: int
+    purchase_notify_email: str
+    site_url: str
+
+
+@lru_cache(maxsize=1)
+def _cfg() -> _EmailSettings:
+    """
+    Email settings read once per process (LazySettings lookups add up in bulk sends).
+    """
+    api_key = (getattr(settings, "SENDGRID_API_KEY", "") or "").strip()
+    return _EmailSettings(
+        use_sendgrid_api=bool(getattr(settings, "SENDGRID_USE_API", False) and api_key),
+        sendgrid_api_key=api_key,
+        sendgrid_api_timeout=int(getattr(settings, "SENDGRID_API_TIMEOUT", 10) or 10),
+        default_from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "") or "",
+        log_errors=bool(getattr(settings, "EMAIL_LOG_ERRORS", False)),
+        log_tracebacks=bool(getattr(settings, "EMAIL_LOG_TRACEBACKS", False)),
+        send_purchase_emails=bool(getattr(settings, "SEND_PURCHASE_EMAILS", False)),
+        send_customer_emails=bool(getattr(settings, "SEND_CUSTOMER_EMAILS", False)),
+        send_winner_emails=bool(getattr(settings, "SEND_WINNER_EMAILS", True)),
+        attach_proof=bool(getattr(settings, "SEND_ATTACH_PROOF", False)),
+        smtp_for_large_attachments=bool(getattr(settings, "EMAIL_SMTP_FOR_LARGE_ATTACHMENTS", False)),
+        worker_threads=max(1, int(getattr(settings, "EMAIL_WORKER_THREADS", 2) or 2)),
+        purchase_notify_email=(getattr(settings, "PURCHASE_NOTIFY_EMAIL", "") or "").strip(),
+        site_url=(getattr(settings, "SITE_URL", "") or "").strip().rstrip("/"),
+    )
+
+
+@receiver(setting_changed)
+def _reset_email_settings(**kwargs) -> None:
+    # override_settings() in tests.
+    _cfg.cache_clear()
+
+
+def _site_url(override: str | None = None) -> str:
+    """
+    Base URL for links: the caller's (e.g. inferred from the request) or SITE_URL,
+    which _cfg() already normalized.
+    """
+    if override:
+        return override.strip().rstrip("/")
+    return _cfg().site_url
+
+
+@lru_cache(maxsize=256)
 def _split_name_email(value: str) -> tuple[str, str]:
     """
     Accepts either:
     - "Name <email@x.com>"
     - "email@x.com"
-    Returns (name, email).
+    Returns (name, email). Cached: the from address and admin inboxes repeat on every send.
     """
     name, email = parseaddr((value or "").strip())
     return (name or "").strip(), (email or "").strip()
@@ -36,20 +112,15 @@ def _make_html_email(*, subject: str, to: list[str], text: str, html: str, from_
     return msg
 
 
-def _email_shell(*, title: str, lead: str, body_html: str, cta_text: str | None = None, cta_url: str | None = None) -> str:
-    """
-    Minimal, modern HTML shell with inline styles (email-client friendly).
-    """
-    safe_cta = ""
-    if cta_text and cta_url:
-        safe_cta = f"""
+_EMAIL_CTA_TEMPLATE = """
           <div style="margin-top:18px;">
             <a href="{cta_url}" style="display:inline-block;background:#10B981;color:#061017;text-decoration:none;font-weight:700;padding:12px 16px;border-radius:12px;">
               {cta_text}
             </a>
           </div>
         """
-    return f"""<!doctype html>
+
+_EMAIL_SHELL_TEMPLATE = """<!doctype html>
 <html>
   <body style="margin:0;padding:0;background:#0b1020;font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial;">
     <div style="max-width:600px;margin:0 auto;padding:20px;">
@@ -70,23 +141,68 @@ def _email_shell(*, title: str, lead: str, body_html: str, cta_text: str | None
         </div>
       </div>
       <div style="text-align:center;margin-top:14px;font-size:12px;color:#64748b;">
-        © {timezone.now().year} GanaHoyRD
+        © {year} GanaHoyRD
       </div>
     </div>
   </body>
 </html>"""
 
 
-def _send_via_sendgrid_api(email: EmailMessage) -> None:
+# Status-update bodies (filled with format_map, like the shell above).
+_STATUS_APPROVED_TEMPLATE = (
+    "<b>Rifa:</b> {raffle}<br><b>Código:</b> {code}<br>"
+    "<br><b>Estado:</b> APROBADA<br>"
+    "<b>Boletos pagados:</b> {paid}<br><b>Boletos gratis:</b> {bonus}<br><b>Total boletos:</b> {total}"
+    "{nums_block}"
+)
+_STATUS_NUMS_TEMPLATE = (
+    "<br><br>"
+    "<div style='padding:12px 14px;border-radius:14px;background:rgba(255,255,255,.04);border:1px solid rgba(255,255,255,.10)'>"
+    "<b>Tus números de boletos:</b><br>"
+    "<span style='font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,monospace;color:#e5e7eb'>{shown}</span>"
+    "<div style='margin-top:8px;font-size:12px;color:#94a3b8'>"
+    "Si no ves todos tus números aquí, entra a “Mis boletos” para ver la lista completa."
+    "</div>"
+    "</div>"
+)
+_STATUS_REJECTED_TEMPLATE = "<b>Rifa:</b> {raffle}<br><b>Código:</b> {code}<br><br><b>Estado:</b> RECHAZADA<br>{reason}"
+_STATUS_OTHER_TEMPLATE = "<b>Rifa:</b> {raffle}<br><b>Código:</b> {code}<br><br><b>Estado:</b> {status}"
+
+
+# Footer year, refreshed at most once an hour: {"year": int, "at": monotonic time}.
+_year_cache = {"year": 0, "at": 0.0}
+
+
+def _current_year() -> int:
+    now = time.monotonic()
+    if not _year_cache["year"] or now - _year_cache["at"] >= 3600:
+        _year_cache["year"] = timezone.now().year
+        _year_cache["at"] = now
+    return _year_cache["year"]
+
+
+def _email_shell(*, title: str, lead: str, body_html: str, cta_text: str | None = None, cta_url: str | None = None) -> str:
     """
-    Send email through SendGrid Web API (HTTPS). Useful when SMTP is blocked.
-    Requires SENDGRID_API_KEY and SENDGRID_USE_API=1.
+    Minimal, modern HTML shell with inline styles (email-client friendly).
     """
-    api_key = (getattr(settings, "SENDGRID_API_KEY", "") or "").strip()
-    if not api_key:
-        raise RuntimeError("Missing SENDGRID_API_KEY")
+    return _EMAIL_SHELL_TEMPLATE.format_map(
+        {"title": title, "lead": lead, "body_html": body_html, "safe_cta": _cta_html(cta_text, cta_url), "year": _current_year()}
+    )
 
-    from_raw = (getattr(email, "from_email", "") or "").strip() or (getattr(settings, "DEFAULT_FROM_EMAIL", "") or "")
+
+@lru_cache(maxsize=128)
+def _cta_html(cta_text: str | None, cta_url: str | None) -> str:
+    # Few distinct (text, url) pairs (site/admin links): build each once. Both come from our code/settings.
+    if not (cta_text and cta_url):
+        return ""
+    return _EMAIL_CTA_TEMPLATE.format_map({"cta_url": cta_url, "cta_text": cta_text})
+
+
+def _sendgrid_payload(email: EmailMessage) -> dict | None:
+    """
+    SendGrid v3 mail/send payload for a Django email (None when it has no recipients).
+    """
+    from_raw = (getattr(email, "from_email", "") or "").strip() or _cfg().default_from_email
     from_name, from_email = _split_name_email(from_raw)
     if not from_email:
         raise RuntimeError("Missing from_email")
@@ -98,7 +214,7 @@ def _send_via_sendgrid_api(email: EmailMessage) -> None:
         if em:
             to_emails.append(em)
     if not to_emails:
-        return
+        return None
 
     payload: dict = {
         "personalizations": [{"to": [{"email": e} for e in to_emails]}],
@@ -143,53 +259,257 @@ def _send_via_sendgrid_api(email: EmailMessage) -> None:
                 "disposition": "attachment",
             }
         )
+    # Already base64-encoded at attach time (see _safe_attach_image).
+    attachments.extend(getattr(email, "_sendgrid_attachments", None) or [])
     if attachments:
         payload["attachments"] = attachments
+    return payload
 
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        "https://api.sendgrid.com/v3/mail/send",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
-    timeout = int(getattr(settings, "SENDGRID_API_TIMEOUT", 10) or 10)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            # 202 Accepted is success.
-            if int(getattr(resp, "status", 0) or 0) not in (200, 202):
-                raise RuntimeError(f"SendGrid API unexpected status: {getattr(resp,'status',None)}")
-    except urllib.error.HTTPError as e:
-        body = ""
+
+def _sendgrid_api_key() -> str:
+    api_key = _cfg().sendgrid_api_key
+    if not api_key:
+        raise RuntimeError("Missing SENDGRID_API_KEY")
+    return api_key
+
+
+# Throttled / gateway errors worth retrying, and the backoff before each retry (seconds).
+_SENDGRID_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_SENDGRID_RETRY_DELAYS = (0.3, 0.6)
+
+
+def _sendgrid_send_payload(payload: dict, api_key: str) -> None:
+    data = _json_bytes(payload)
+    timeout = _cfg().sendgrid_api_timeout
+    status, body = _sendgrid_post(data, api_key=api_key, timeout=timeout)
+    for delay in _SENDGRID_RETRY_DELAYS:
+        if status not in _SENDGRID_RETRY_STATUSES:
+            break
+        time.sleep(delay)
+        status, body = _sendgrid_post(data, api_key=api_key, timeout=timeout)
+    # 202 Accepted is success.
+    if status >= 400:
+        raise RuntimeError(f"SendGrid API HTTPError {status}: {body.decode('utf-8', 'ignore')}")
+    if status not in (200, 202):
+        raise RuntimeError(f"SendGrid API unexpected status: {status}")
+
+
+def _send_via_sendgrid_api(email: EmailMessage) -> None:
+    """
+    Send email through SendGrid Web API (HTTPS). Useful when SMTP is blocked.
+    Requires SENDGRID_API_KEY and SENDGRID_USE_API=1.
+    """
+    api_key = _sendgrid_api_key()
+    payload = _sendgrid_payload(email)
+    if payload is not None:
+        _sendgrid_send_payload(payload, api_key)
+
+
+# SendGrid accepts up to 1000 personalizations per request.
+_SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+
+def _send_via_sendgrid_api_bulk(emails: list[EmailMessage]) -> None:
+    """
+    Send many emails through the SendGrid API: emails whose content is identical
+    (same from/subject/body/attachments) go out as one request with one
+    personalization per email instead of one request each.
+    """
+    api_key = _sendgrid_api_key()
+    groups: dict[str, dict] = {}
+    for email in emails:
+        payload = _sendgrid_payload(email)
+        if payload is None:
+            continue
+        personalizations = payload.pop("personalizations")
+        key = json.dumps(payload, sort_keys=True)
+        group = groups.setdefault(key, {"payload": payload, "personalizations": []})
+        group["personalizations"].extend(personalizations)
+    errors: list[str] = []
+    for group in groups.values():
+        items = group["personalizations"]
+        for i in range(0, len(items), _SENDGRID_MAX_PERSONALIZATIONS):
+            try:
+                _sendgrid_send_payload(
+                    {**group["payload"], "personalizations": items[i : i + _SENDGRID_MAX_PERSONALIZATIONS]},
+                    api_key,
+                )
+            except Exception as e:
+                # Keep sending the other groups; report everything that failed at the end.
+                errors.append(str(e) or e.__class__.__name__)
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+
+_SENDGRID_HOST = "api.sendgrid.com"
+_SENDGRID_PATH = "/v3/mail/send"
+# One kept-alive HTTPS connection per thread (the sender workers reuse theirs across emails).
+_sendgrid_local = threading.local()
+
+
+def _sendgrid_post(data: bytes, *, api_key: str, timeout: int) -> tuple[int, bytes]:
+    """
+    POST to the SendGrid mail endpoint reusing this thread's connection
+    (no TCP/TLS handshake per email). Returns (status, body).
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    while True:
+        conn = getattr(_sendgrid_local, "conn", None)
+        reused = conn is not None
+        if conn is None:
+            conn = _sendgrid_local.conn = http.client.HTTPSConnection(_SENDGRID_HOST, timeout=timeout)
+        conn.timeout = timeout
         try:
-            body = e.read().decode("utf-8", "ignore")
+            conn.request("POST", _SENDGRID_PATH, body=data, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()  # drain so the connection can be reused
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _sendgrid_local.conn = None
+            if reused:
+                # Stale keep-alive connection (dropped, half-closed TLS, bad state):
+                # retry once on a fresh one; that attempt isn't "reused", so no loop.
+                continue
+            raise
         except Exception:
-            body = ""
-        raise RuntimeError(f"SendGrid API HTTPError {e.code}: {body}") from e
+            conn.close()
+            _sendgrid_local.conn = None
+            raise
+        if resp.will_close:
+            conn.close()
+            _sendgrid_local.conn = None
+        return resp.status, body
+
+
+# Background senders: a queue drained by EMAIL_WORKER_THREADS long-lived threads
+# (started on first use) instead of one new thread per email.
+_email_queue: queue.Queue = queue.Queue()
+_workers_lock = threading.Lock()
+_workers: list[threading.Thread] = []
+
+
+def _use_sendgrid_api() -> bool:
+    return _cfg().use_sendgrid_api
+
+
+def _via_api(email: EmailMessage) -> bool:
+    # email._force_smtp: this message goes through the Django backend even when the API is on.
+    return _use_sendgrid_api() and not getattr(email, "_force_smtp", False)
+
+
+def _deliver(emails: list[EmailMessage], prepare=None) -> None:
+    try:
+        if prepare is not None:
+            for email in emails:
+                prepare(email)
+        api = [e for e in emails if _via_api(e)]
+        smtp = [e for e in emails if not _via_api(e)]
+        if len(api) == 1:
+            _send_via_sendgrid_api(api[0])
+        elif api:
+            _send_via_sendgrid_api_bulk(api)
+        if len(smtp) == 1:
+            smtp[0].send(fail_silently=True)
+        elif smtp:
+            # One SMTP session for the whole batch.
+            get_connection(fail_silently=True).send_messages(smtp)
+    except Exception as e:
+        if _cfg().log_errors:
+            logger.warning("Email send failed: %r", e, exc_info=_cfg().log_tracebacks)
+
+
+def _email_worker() -> None:
+    while True:
+        emails, prepare = _email_queue.get()
+        try:
+            _deliver(emails, prepare)
+        finally:
+            _email_queue.task_done()
+
+
+def _ensure_email_workers() -> None:
+    size = _cfg().worker_threads
+    if len(_workers) >= size and all(t.is_alive() for t in _workers):
+        return
+    with _workers_lock:
+        _workers[:] = [t for t in _workers if t.is_alive()]
+        while len(_workers) < size:
+            t = threading.Thread(target=_email_worker, name="email-sender", daemon=True)
+            t.start()
+            _workers.append(t)
+
+
+# How long interpreter exit waits for queued emails (e.g. gunicorn recycling a worker).
+_EXIT_DRAIN_SECONDS = 10
 
 
-def _send_async(email: EmailMessage) -> None:
+def _drain_on_exit() -> None:
+    if not _workers:
+        return
+    deadline = time.monotonic() + _EXIT_DRAIN_SECONDS
+    while _email_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+atexit.register(_drain_on_exit)
+
+
+def _send_async(email: EmailMessage, prepare=None) -> None:
     """
-    Send email in a background thread so web requests don't hang
-    if SMTP is slow/unreachable.
+    Send email in the background so web requests don't hang
+    if SMTP is slow/unreachable. prepare(email), if given, runs in the
+    sender thread first (e.g. attaching files).
     """
+    _enqueue(([email], prepare))
 
-    def _runner():
-        try:
-            if getattr(settings, "SENDGRID_USE_API", False) and getattr(settings, "SENDGRID_API_KEY", ""):
-                _send_via_sendgrid_api(email)
-            else:
-                email.send(fail_silently=True)
-        except Exception as e:
-            if getattr(settings, "EMAIL_LOG_ERRORS", False):
-                logger.warning("Email send failed: %s", e, exc_info=True)
-            return
 
-    t = threading.Thread(target=_runner, daemon=True)
-    t.start()
+def _send_async_many(emails: list[EmailMessage]) -> None:
+    """
+    Queue several emails as one background job (one SendGrid request per group of
+    identical emails, or one SMTP session).
+    """
+    if not emails:
+        return
+    _enqueue((list(emails), None))
+
+
+# Jobs queued during a request (see DeferredEmailMiddleware); None outside one.
+_pending = threading.local()
+
+
+def defer_sends() -> None:
+    """
+    Hold background sends made from now on in this thread until the request finishes.
+    """
+    _pending.jobs = []
+
+
+def _enqueue(job: tuple) -> None:
+    jobs = getattr(_pending, "jobs", None)
+    if jobs is not None:
+        jobs.append(job)
+        return
+    _ensure_email_workers()
+    _email_queue.put(job)
+
+
+@receiver(request_finished)
+def flush_deferred_sends(**kwargs) -> None:
+    jobs = getattr(_pending, "jobs", None)
+    _pending.jobs = None
+    if not jobs:
+        return
+    # Plain emails go out as one batch; jobs with a prepare step keep their own.
+    plain = [e for emails, prepare in jobs if prepare is None for e in emails]
+    _ensure_email_workers()
+    if plain:
+        _email_queue.put((plain, None))
+    for emails, prepare in jobs:
+        if prepare is not None:
+            _email_queue.put((emails, prepare))
 
 
 def _send_now(email: EmailMessage) -> tuple[bool, str]:
@@ -198,7 +518,7 @@ def _send_now(email: EmailMessage) -> tuple[bool, str]:
     Returns (ok, error_message).
     """
     try:
-        if getattr(settings, "SENDGRID_USE_API", False) and getattr(settings, "SENDGRID_API_KEY", ""):
+        if _via_api(email):
             _send_via_sendgrid_api(email)
             return True, ""
         # SMTP/backend
@@ -206,13 +526,32 @@ def _send_now(email: EmailMessage) -> tuple[bool, str]:
         return (sent >= 1), ("" if sent else "No se pudo enviar (sent=0).")
     except Exception as e:
         msg = str(e) or e.__class__.__name__
-        if getattr(settings, "EMAIL_LOG_ERRORS", False):
-            logger.warning("Email send failed: %s", msg, exc_info=True)
+        if _cfg().log_errors:
+            logger.warning("Email send failed: %s", msg, exc_info=_cfg().log_tracebacks)
         return False, msg
 
 
 def _should_send_customer_emails() -> bool:
-    return bool(getattr(settings, "SEND_CUSTOMER_EMAILS", False))
+    return _cfg().send_customer_emails
+
+
+def _b64_file(path: str, chunk_size: int = 3 * 16384) -> str:
+    """
+    Base64 of a file read in chunks (multiples of 3 bytes encode independently).
+    """
+    parts = []
+    with open(path, "rb") as fh:
+        while chunk := fh.read(chunk_size):
+            parts.append(base64.b64encode(chunk).decode("ascii"))
+    return "".join(parts)
+
+
+# Dates in emails: always the site's TIME_ZONE (nothing here activates per-user zones).
+_DATETIME_FORMAT = "%d/%m/%Y %I:%M %p"
+
+
+# With EMAIL_SMTP_FOR_LARGE_ATTACHMENTS, proofs above this go over SMTP even when the API is on.
+_SMTP_ATTACHMENT_MIN_BYTES = 256 * 1024
 
 
 def _safe_attach_image(email: EmailMessage, purchase: TicketPurchase) -> None:
@@ -226,13 +565,28 @@ def _safe_attach_image(email: EmailMessage, purchase: TicketPurchase) -> None:
         # Keep attachments small so sending is fast (SendGrid API base64 grows size).
         if getattr(f, "size", 0) and f.size > 1024 * 1024:
             return
-        f.open("rb")
+        try:
+            path = f.path
+        except NotImplementedError:
+            # Remote storage: the email already carries the proof URL.
+            return
         mimetype, _enc = mimetypes.guess_type(f.name)
-        email.attach(
-            filename=f.name.rsplit("/", 1)[-1],
-            content=f.read(),
-            mimetype=mimetype or "image/*",
-        )
+        if _use_sendgrid_api() and _cfg().smtp_for_large_attachments and f.size > _SMTP_ATTACHMENT_MIN_BYTES:
+            # Raw bytes over SMTP instead of ~1.33x base64 inside the API JSON.
+            email._force_smtp = True
+        if _via_api(email):
+            # Encode straight from disk once; the raw bytes are never kept on the email.
+            email._sendgrid_attachments = getattr(email, "_sendgrid_attachments", []) + [
+                {
+                    "content": _b64_file(path),
+                    "type": mimetype or "image/*",
+                    "filename": os.path.basename(path),
+                    "disposition": "attachment",
+                }
+            ]
+            return
+        # attach_file opens and closes the file itself (f.open() used to leak the handle).
+        email.attach_file(path, mimetype=mimetype or "image/*")
     except Exception:
         return
 
@@ -242,9 +596,9 @@ def send_purchase_notification(*, request, purchase: TicketPurchase) -> None:
     Sends a purchase notification (with proof) to the configured admin inbox.
     In dev, emails are printed to the console if EMAIL_BACKEND is console backend.
     """
-    if not getattr(settings, "SEND_PURCHASE_EMAILS", False):
+    if not _cfg().send_purchase_emails:
         return
-    to_email = (getattr(settings, "PURCHASE_NOTIFY_EMAIL", "") or "").strip()
+    to_email = _cfg().purchase_notify_email
     if not to_email:
         return
 
@@ -257,21 +611,18 @@ def send_purchase_notification(*, request, purchase: TicketPurchase) -> None:
     except Exception:
         proof_url = ""
 
-    lines = [
-        f"Fecha: {timezone.localtime(purchase.created_at):%d/%m/%Y %I:%M %p}",
-        f"Rifa: {raffle.title}",
-        f"Compra ID: {purchase.id}",
-        f"Código consulta: {purchase.public_reference}",
-        f"Nombre: {purchase.full_name}",
-        f"Teléfono: {purchase.phone}",
-        f"Email: {purchase.email or '-'}",
-        f"Cantidad (pagados): {purchase.quantity}",
-        f"Total: RD$ {purchase.total_amount}",
-    ]
-    if proof_url:
-        lines.append(f"Comprobante (URL): {proof_url}")
-
-    body = "\n".join(lines) + "\n"
+    body = (
+        f"Fecha: {purchase.created_at.astimezone(timezone.get_default_timezone()).strftime(_DATETIME_FORMAT)}\n"
+        f"Rifa: {raffle.title}\n"
+        f"Compra ID: {purchase.id}\n"
+        f"Código consulta: {purchase.public_reference}\n"
+        f"Nombre: {purchase.full_name}\n"
+        f"Teléfono: {purchase.phone}\n"
+        f"Email: {purchase.email or '-'}\n"
+        f"Cantidad (pagados): {purchase.quantity}\n"
+        f"Total: RD$ {purchase.total_amount}\n"
+        + (f"Comprobante (URL): {proof_url}\n" if proof_url else "")
+    )
 
     html = _email_shell(
         title="Nueva compra pendiente",
@@ -293,9 +644,12 @@ def send_purchase_notification(*, request, purchase: TicketPurchase) -> None:
     )
     email = _make_html_email(subject=subject, to=[to_email], text=body, html=html)
 
-    _safe_attach_image(email, purchase)
-
-    _send_async(email)
+    # The body already links the proof; over the API that is enough unless attaching is requested.
+    if proof_url and _use_sendgrid_api() and not _cfg().attach_proof:
+        _send_async(email)
+        return
+    # Read the proof in the sender thread, not in the purchase request.
+    _send_async(email, prepare=lambda e: _safe_attach_image(e, purchase))
 
 
 def send_customer_purchase_received(*, purchase: TicketPurchase) -> None:
@@ -324,7 +678,7 @@ def send_customer_purchase_received(*, purchase: TicketPurchase) -> None:
             "— GanaHoyRD",
         ]
     )
-    site_url = (getattr(settings, "SITE_URL", "") or "").rstrip("/")
+    site_url = _site_url()
     html = _email_shell(
         title="Recibimos tu compra",
         lead="Gracias por participar. Tu compra quedó en estado pendiente mientras verificamos el comprobante.",
@@ -343,15 +697,10 @@ def send_customer_purchase_received(*, purchase: TicketPurchase) -> None:
     _send_async(_make_html_email(subject=subject, to=[to_email], text=body, html=html))
 
 
-def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
-    """
-    Customer email when purchase is approved/rejected.
-    """
-    if not _should_send_customer_emails():
-        return
+def _build_customer_purchase_status_email(purchase: TicketPurchase) -> EmailMessage | None:
     to_email = (purchase.email or "").strip()
     if not to_email:
-        return
+        return None
 
     status = purchase.status
     raffle = purchase.raffle
@@ -365,13 +714,21 @@ def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
     ]
 
     nums: list[str] = []
+    shown = ""
     if status == TicketPurchase.Status.APPROVED:
         # Ticket numbers are created when approved.
         try:
-            for t in purchase.tickets.order_by("number").all()[:200]:
-                nums.append(getattr(t, "display_number", str(t.number)))
+            # Plain numbers + one padding width: no Ticket (or per-ticket Raffle) loads.
+            max_tickets = int(getattr(raffle, "max_tickets", 0) or 0)
+            nums = [
+                Ticket.format_number(n, max_tickets)
+                for n in purchase.tickets.order_by("number").values_list("number", flat=True)[:200]
+            ]
         except Exception:
             nums = []
+        if nums:
+            # Joined once; reused by the text and HTML bodies.
+            shown = ", ".join(nums) + (" ..." if len(nums) >= 200 else "")
 
         lines += [
             "",
@@ -380,11 +737,11 @@ def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
             f"Boletos gratis: {purchase.bonus_quantity}",
             f"Total boletos: {purchase.total_tickets}",
         ]
-        if nums:
+        if shown:
             lines += [
                 "",
                 "Tus números de boletos:",
-                ", ".join(nums) + ("" if len(nums) < 200 else " ..."),
+                shown,
             ]
     elif status == TicketPurchase.Status.REJECTED:
         lines += [
@@ -400,44 +757,24 @@ def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
 
     lines += ["", "— GanaHoyRD"]
     body_text = "\n".join(lines)
-    site_url = (getattr(settings, "SITE_URL", "") or "").rstrip("/")
+    site_url = _site_url()
 
+    fields = {"raffle": raffle.title, "code": purchase.public_reference}
     if status == TicketPurchase.Status.APPROVED:
-        nums_html = ""
-        if nums:
-            shown = ", ".join(nums) + ("" if len(nums) < 200 else " ...")
-            nums_html = (
-                "<br><br>"
-                "<div style='padding:12px 14px;border-radius:14px;background:rgba(255,255,255,.04);border:1px solid rgba(255,255,255,.10)'>"
-                "<b>Tus números de boletos:</b><br>"
-                f"<span style='font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,monospace;color:#e5e7eb'>{shown}</span>"
-                "<div style='margin-top:8px;font-size:12px;color:#94a3b8'>"
-                "Si no ves todos tus números aquí, entra a “Mis boletos” para ver la lista completa."
-                "</div>"
-                "</div>"
-            )
-        body_html = "<br>".join(
-            [
-                f"<b>Rifa:</b> {raffle.title}",
-                f"<b>Código:</b> {purchase.public_reference}",
-                "<br><b>Estado:</b> APROBADA",
-                f"<b>Boletos pagados:</b> {purchase.quantity}",
-                f"<b>Boletos gratis:</b> {purchase.bonus_quantity}",
-                f"<b>Total boletos:</b> {purchase.total_tickets}",
-            ]
-        ) + nums_html
+        body_html = _STATUS_APPROVED_TEMPLATE.format_map(
+            {
+                **fields,
+                "paid": purchase.quantity,
+                "bonus": purchase.bonus_quantity,
+                "total": purchase.total_tickets,
+                "nums_block": _STATUS_NUMS_TEMPLATE.format_map({"shown": shown}) if shown else "",
+            }
+        )
     elif status == TicketPurchase.Status.REJECTED:
         notes = (purchase.admin_notes or "").strip()
-        body_html = "<br>".join(
-            [
-                f"<b>Rifa:</b> {raffle.title}",
-                f"<b>Código:</b> {purchase.public_reference}",
-                "<br><b>Estado:</b> RECHAZADA",
-                (f"<br><b>Motivo:</b> {notes}" if notes else ""),
-            ]
-        )
+        body_html = _STATUS_REJECTED_TEMPLATE.format_map({**fields, "reason": (f"<br><b>Motivo:</b> {notes}" if notes else "")})
     else:
-        body_html = "<br>".join([f"<b>Rifa:</b> {raffle.title}", f"<b>Código:</b> {purchase.public_reference}", f"<br><b>Estado:</b> {status}"])
+        body_html = _STATUS_OTHER_TEMPLATE.format_map({**fields, "status": status})
 
     html = _email_shell(
         title="Actualización de tu compra",
@@ -446,19 +783,39 @@ def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
         cta_text="Ver Mis boletos",
         cta_url=(f"{site_url}/mis-boletos/" if site_url else None),
     )
-    _send_async(_make_html_email(subject=subject, to=[to_email], text=body_text, html=html))
+    return _make_html_email(subject=subject, to=[to_email], text=body_text, html=html)
 
 
-def send_winner_notification(*, raffle, purchase, ticket_display: str, site_url: str | None = None) -> None:
+def send_customer_purchase_status(*, purchase: TicketPurchase) -> None:
     """
-    Email to the winner when raffle winner ticket is assigned in admin.
+    Customer email when purchase is approved/rejected.
     """
-    if not getattr(settings, "SEND_WINNER_EMAILS", True):
+    if not _should_send_customer_emails():
         return
-    to_email = (getattr(purchase, "email", "") or "").strip()
-    if not to_email:
+    email = _build_customer_purchase_status_email(purchase)
+    if email is not None:
+        _send_async(email)
+
+
+def send_customer_purchase_status_bulk(*, purchases) -> None:
+    """
+    send_customer_purchase_status for many purchases (admin bulk actions) as one background job.
+    """
+    if not _should_send_customer_emails():
         return
+    emails = []
+    for purchase in purchases:
+        try:
+            email = _build_customer_purchase_status_email(purchase)
+        except Exception:
+            continue
+        if email is not None:
+            emails.append(email)
+    _send_async_many(emails)
+
 
+def _build_winner_email(*, raffle, purchase, ticket_display: str, site_url: str | None = None) -> EmailMultiAlternatives:
+    to_email = (getattr(purchase, "email", "") or "").strip()
     subject = f"¡Felicidades! Ganaste la rifa - {getattr(raffle, 'title', '')}"
     text = "\n".join(
         [
@@ -472,7 +829,7 @@ def send_winner_notification(*, raffle, purchase, ticket_display: str, site_url:
             "— GanaHoyRD",
         ]
     )
-    base = (site_url or getattr(settings, "SITE_URL", "") or "").strip().rstrip("/")
+    base = _site_url(site_url)
     raffle_url = f"{base}/rifa/{getattr(raffle, 'slug', '')}/" if base else None
     html = _email_shell(
         title="¡Felicidades! Eres el ganador(a)",
@@ -487,49 +844,67 @@ def send_winner_notification(*, raffle, purchase, ticket_display: str, site_url:
         cta_text="Ver la rifa",
         cta_url=raffle_url,
     )
-    _send_async(_make_html_email(subject=subject, to=[to_email], text=text, html=html))
+    return _make_html_email(subject=subject, to=[to_email], text=text, html=html)
+
+
+def _winner_email_skip_reason(purchase) -> str:
+    if not _cfg().send_winner_emails:
+        return "Envio de correo al ganador deshabilitado (SEND_WINNER_EMAILS=0)."
+    if not (getattr(purchase, "email", "") or "").strip():
+        return "El ganador no tiene email."
+    return ""
+
+
+def send_winner_notification(*, raffle, purchase, ticket_display: str, site_url: str | None = None) -> None:
+    """
+    Email to the winner when raffle winner ticket is assigned in admin.
+    """
+    if _winner_email_skip_reason(purchase):
+        return
+    _send_async(_build_winner_email(raffle=raffle, purchase=purchase, ticket_display=ticket_display, site_url=site_url))
 
 
 def send_winner_notification_sync(*, raffle, purchase, ticket_display: str, site_url: str | None = None) -> tuple[bool, str]:
     """
     Synchronous winner email (returns success + error for admin feedback).
     """
-    if not getattr(settings, "SEND_WINNER_EMAILS", True):
-        return False, "Envio de correo al ganador deshabilitado (SEND_WINNER_EMAILS=0)."
-    to_email = (getattr(purchase, "email", "") or "").strip()
-    if not to_email:
-        return False, "El ganador no tiene email."
+    skip = _winner_email_skip_reason(purchase)
+    if skip:
+        return False, skip
+    return _send_now(_build_winner_email(raffle=raffle, purchase=purchase, ticket_display=ticket_display, site_url=site_url))
 
-    subject = f"¡Felicidades! Ganaste la rifa - {getattr(raffle, 'title', '')}"
-    text = "\n".join(
-        [
-            "¡Felicidades!",
-            "",
-            "Has resultado ganador(a) en GanaHoyRD.",
-            f"Rifa: {getattr(raffle, 'title', '')}",
-            f"Boleto ganador: #{ticket_display}",
-            "",
-            "Nos pondremos en contacto contigo para coordinar la entrega.",
-            "— GanaHoyRD",
-        ]
-    )
-    base = (site_url or getattr(settings, "SITE_URL", "") or "").strip().rstrip("/")
-    raffle_url = f"{base}/rifa/{getattr(raffle, 'slug', '')}/" if base else None
-    html = _email_shell(
-        title="¡Felicidades! Eres el ganador(a)",
-        lead="Premios reales y ganadores reales. Gracias por participar.",
-        body_html="<br>".join(
-            [
-                f"<b>Rifa:</b> {getattr(raffle, 'title', '')}",
-                f"<b>Boleto ganador:</b> #{ticket_display}",
-                "<br>Nos pondremos en contacto contigo para coordinar la entrega.",
-            ]
-        ),
-        cta_text="Ver la rifa",
-        cta_url=raffle_url,
-    )
-    email = _make_html_email(subject=subject, to=[to_email], text=text, html=html)
-    return _send_now(email)
+
+def send_winner_notification_background(*, raffle, purchase, ticket_display: str, site_url: str | None = None, on_done=None) -> None:
+    """
+    Winner email on a background thread; on_done(ok, error) runs there once it's sent.
+    """
+    skip = _winner_email_skip_reason(purchase)
+    if skip:
+        # Nothing to send: report right away instead of starting a thread for it.
+        if on_done is not None:
+            try:
+                on_done(False, skip)
+            except Exception:
+                pass
+        return
+
+    def _runner():
+        try:
+            ok, err = send_winner_notification_sync(raffle=raffle, purchase=purchase, ticket_display=ticket_display, site_url=site_url)
+        except Exception as e:
+            ok, err = False, str(e) or e.__class__.__name__
+        if on_done is None:
+            return
+        try:
+            on_done(ok, err)
+        except Exception:
+            pass
+        finally:
+            # on_done may use the DB; don't leak this thread's connection.
+            connections.close_all()
+
+    t = threading.Thread(target=_runner, daemon=True)
+    t.start()
 
 
 def send_admin_temporary_password(*, to_email: str, username: str, temp_password: str, site_url: str | None = None) -> tuple[bool, str]:
@@ -542,7 +917,7 @@ def send_admin_temporary_password(*, to_email: str, username: str, temp_password
     if not to_email:
         return False, "Missing to_email"
 
-    base = (site_url or getattr(settings, "SITE_URL", "") or "").strip().rstrip("/")
+    base = _site_url(site_url)
     admin_url = f"{base}/admin/" if base else None
 
     subject = "Recuperación de contraseña (Admin) - GanaHoyRD"
@@ -594,7 +969,7 @@ def send_new_admin_user_credentials(*, to_email: str, username: str, temp_passwo
     if not to_email:
         return False, "Missing to_email"
 
-    base = (site_url or getattr(settings, "SITE_URL", "") or "").strip().rstrip("/")
+    base = _site_url(site_url)
     admin_url = f"{base}/admin/" if base else None
 
     subject = "Tu acceso al Admin - GanaHoyRD"
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import io
+import math
 import os
+import re
 
 from django import forms
 from django.core.exceptions import ValidationError
@@ -10,6 +12,10 @@ from django.core.files.uploadedfile import InMemoryUploadedFile
 from .models import BankAccount, Raffle, TicketPurchase
 
 
+# Phone/ticket inputs: strip everything but digits in one C-level pass.
+_NON_DIGITS_RE = re.compile(r"\D+")
+
+
 def _looks_like_image(file) -> bool:
     """
     Best-effort file signature check (do not trust content_type).
@@ -60,9 +66,18 @@ def _optimize_image_upload(file, *, target_max_bytes: int = 6 * 1024 * 1024) ->
     """
     from PIL import Image, ImageOps  # Pillow
 
+    # Largest size tried below; anything bigger gets downscaled anyway.
+    max_dim_candidates = [1600, 1400, 1200, 1000, 900, 800]
+
     # Read image
     file.seek(0)
     img = Image.open(file)
+    if img.format == "JPEG":
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (DCT domain) while the long side
+        # stays >= the largest candidate: much faster decode of big phone photos.
+        ratio = max_dim_candidates[0] / float(max(img.size))
+        if ratio < 0.5:
+            img.draft(None, (math.ceil(img.size[0] * ratio), math.ceil(img.size[1] * ratio)))
     img = ImageOps.exif_transpose(img)  # correct orientation
 
     # Convert to RGB (drop alpha)
@@ -78,40 +93,48 @@ def _optimize_image_upload(file, *, target_max_bytes: int = 6 * 1024 * 1024) ->
 
     # Try a couple of downscale + quality steps.
     # Keep this relatively small so processing is fast on big uploads.
-    max_dim_candidates = [1600, 1400, 1200, 1000, 900, 800]
     quality_candidates = [75, 70, 65, 60, 55, 50, 45]
 
-    best_bytes = None
-    best_buf = None
+    def encode(image, quality: int) -> io.BytesIO:
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return buf
 
+    best_buf = None
+    resized = img
     for max_dim in max_dim_candidates:
-        w, h = img.size
+        # Each step shrinks the previous (already smaller) image, not the original upload.
+        w, h = resized.size
         scale = min(1.0, max_dim / float(max(w, h)))
         if scale < 1.0:
             # LANCZOS is high quality but slower; BICUBIC is a good balance for speed.
-            resized = img.resize((int(w * scale), int(h * scale)), Image.BICUBIC)
-        else:
-            resized = img
-
-        for q in quality_candidates:
-            buf = io.BytesIO()
-            resized.save(buf, format="JPEG", quality=q, optimize=True, progressive=True)
-            size = buf.tell()
-            if best_bytes is None or size < best_bytes:
-                best_bytes = size
+            # reducing_gap: cheap integer box reduce() first, BICUBIC only for the last <3x.
+            resized = resized.resize((int(w * scale), int(h * scale)), Image.BICUBIC, reducing_gap=3.0)
+
+        # Usual case: the first (best) quality already fits.
+        buf = encode(resized, quality_candidates[0])
+        if buf.tell() <= target_max_bytes:
+            best_buf = buf
+            break
+        # Otherwise bisect for the best quality that fits (size shrinks with quality):
+        # ~3 encodes per size instead of up to 7. Only the current fit is kept.
+        lo, hi = 1, len(quality_candidates) - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            buf = encode(resized, quality_candidates[mid])
+            if buf.tell() <= target_max_bytes:
                 best_buf = buf
-            if size <= target_max_bytes:
-                break
-        if best_bytes is not None and best_bytes <= target_max_bytes:
+                hi = mid - 1
+            else:
+                lo = mid + 1
+        if best_buf is not None:
             break
 
-    if best_buf is None or best_bytes is None:
-        raise ValidationError("No se pudo procesar la imagen. Intenta con otra.")
-
-    # If still too large, fail (rare)
-    if best_bytes > target_max_bytes:
+    # Nothing fit even at the smallest size/quality (rare).
+    if best_buf is None:
         raise ValidationError("La imagen es muy grande incluso después de optimizarla.")
 
+    best_bytes = best_buf.tell()
     best_buf.seek(0)
     base_name = os.path.basename(getattr(file, "name", "comprobante.jpg")).rsplit(".", 1)[0]
     out_name = f"{base_name}.jpg"
@@ -126,11 +149,11 @@ def _optimize_image_upload(file, *, target_max_bytes: int = 6 * 1024 * 1024) ->
     )
 
 
-PHONE_PREFIX_CHOICES = [
+PHONE_PREFIX_CHOICES = (
     ("809", "809"),
     ("829", "829"),
     ("849", "849"),
-]
+)
 
 
 class TicketPurchaseForm(forms.ModelForm):
@@ -208,7 +231,7 @@ class TicketPurchaseForm(forms.ModelForm):
 
         # If editing an instance, split existing phone into prefix + number
         if self.instance and getattr(self.instance, "phone", None):
-            digits = "".join(ch for ch in (self.instance.phone or "") if ch.isdigit())
+            digits = _NON_DIGITS_RE.sub("", self.instance.phone or "")
             if len(digits) >= 3:
                 self.fields["phone_prefix"].initial = digits[:3]
                 self.fields["phone_number"].initial = digits[3:]
@@ -232,15 +255,9 @@ class TicketPurchaseForm(forms.ModelForm):
     proof_image = forms.ImageField(validators=[validate_image_file])
 
     def clean_proof_image(self):
-        f = self.cleaned_data.get("proof_image")
-        if not f:
-            return f
-        # Transparente: optimizamos el comprobante para que pese poco y
-        # los correos (y el almacenamiento) sean rápidos.
-        target_max_bytes = 500 * 1024  # ~500KB (faster to upload/send/store)
-        if getattr(f, "size", 0) > target_max_bytes:
-            return _optimize_image_upload(f, target_max_bytes=target_max_bytes)
-        return f
+        # Stored as uploaded (validate_image_file checks type/size); big proofs are
+        # recompressed after the purchase is saved (see proof_images.py), not here.
+        return self.cleaned_data.get("proof_image")
 
     def clean_full_name(self):
         name = (self.cleaned_data.get("full_name") or "").strip()
@@ -252,7 +269,7 @@ class TicketPurchaseForm(forms.ModelForm):
 
     def clean_phone_number(self):
         raw = (self.cleaned_data.get("phone_number") or "").strip()
-        digits = "".join(ch for ch in raw if ch.isdigit())
+        digits = _NON_DIGITS_RE.sub("", raw)
         if not digits:
             raise ValidationError("Ingresa el número de teléfono.")
         # República Dominicana: 7 dígitos después del prefijo (normal).
@@ -325,7 +342,7 @@ class TicketLookupForm(forms.Form):
 
     def clean_phone_number(self):
         raw = (self.cleaned_data.get("phone_number") or "").strip()
-        digits = "".join(ch for ch in raw if ch.isdigit())
+        digits = _NON_DIGITS_RE.sub("", raw)
         if not digits:
             raise ValidationError("Ingresa el número de teléfono.")
         if len(digits) != 7:
@@ -381,7 +398,7 @@ class AdminWinnerLookupForm(forms.Form):
 
     def clean_ticket_number(self) -> int:
         raw = (self.cleaned_data.get("ticket_number") or "").strip()
-        digits = "".join(ch for ch in raw if ch.isdigit())
+        digits = _NON_DIGITS_RE.sub("", raw)
         if not digits:
             raise ValidationError("Ingresa el número de boleto.")
         n = int(digits)
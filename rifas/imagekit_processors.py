@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from PIL import Image, ImageChops
 
 
+@lru_cache(maxsize=8)
+def _threshold_table(tolerance: int) -> list[int]:
+    # 256-entry lookup for Image.point(): background (<= tolerance) -> 0, content -> 255.
+    return [255 if p > tolerance else 0 for p in range(256)]
+
+
 @dataclass(frozen=True)
 class AutoTrim:
     """
@@ -20,12 +27,16 @@ class AutoTrim:
         if img is None:
             return img
 
-        # Normalize orientation / mode
-        work = img.convert("RGBA")
+        if img.mode == "RGB":
+            # Most uploads (JPEG): nothing to composite, skip three full-size copies.
+            work = img
+        else:
+            # Normalize orientation / mode
+            work = img.convert("RGBA")
 
-        # Composite on white to treat transparency as background.
-        bg = Image.new("RGBA", work.size, (255, 255, 255, 255))
-        work = Image.alpha_composite(bg, work).convert("RGB")
+            # Composite on white to treat transparency as background.
+            bg = Image.new("RGBA", work.size, (255, 255, 255, 255))
+            work = Image.alpha_composite(bg, work).convert("RGB")
 
         # Use the top-left pixel as background reference (common for product images).
         bg_color = work.getpixel((0, 0))
@@ -33,7 +44,7 @@ class AutoTrim:
         diff = ImageChops.difference(work, bg_img)
 
         # Convert to mask and apply tolerance.
-        mask = diff.convert("L").point(lambda p: 255 if p > self.tolerance else 0)
+        mask = diff.convert("L").point(_threshold_table(self.tolerance))
         bbox = mask.getbbox()
         if not bbox:
             return img
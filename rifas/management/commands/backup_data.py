@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import gzip
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -67,33 +68,28 @@ class Command(BaseCommand):
         ]
 
         self.stdout.write(f"Creando backup en: {out_file}")
-        tmp_path = None
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as tmp:
-                tmp_path = Path(tmp.name)
-                # Ensure UTF-8 regardless of console/codepage.
-                env = dict(os.environ)
-                env["PYTHONIOENCODING"] = "utf-8"
-                proc = subprocess.Popen(cmd, stdout=tmp, stderr=subprocess.PIPE, env=env)
-                _out, err = proc.communicate()
+            # Ensure UTF-8 regardless of console/codepage.
+            env = dict(os.environ)
+            env["PYTHONIOENCODING"] = "utf-8"
+            # Stream dumpdata straight into gzip (no uncompressed temp copy on disk).
+            # stderr goes to a small temp file so a chatty stderr can't block the pipe.
+            with tempfile.TemporaryFile() as err_file, gzip.open(out_file, "wb", compresslevel=6) as gz:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err_file, env=env)
+                try:
+                    shutil.copyfileobj(proc.stdout, gz, 256 * 1024)
+                finally:
+                    proc.stdout.close()
+                    proc.wait()
                 if proc.returncode != 0:
-                    raise RuntimeError(f"dumpdata falló: {err.decode('utf-8', 'ignore')}")
-
-            with open(tmp_path, "rb") as src, gzip.open(out_file, "wb", compresslevel=6) as gz:
-                for chunk in iter(lambda: src.read(1024 * 64), b""):
-                    gz.write(chunk)
+                    err_file.seek(0)
+                    raise RuntimeError(f"dumpdata falló: {err_file.read().decode('utf-8', 'ignore')}")
         except Exception:
             try:
                 out_file.unlink(missing_ok=True)  # type: ignore[attr-defined]
             except Exception:
                 pass
             raise
-        finally:
-            if tmp_path:
-                try:
-                    tmp_path.unlink()
-                except Exception:
-                    pass
 
         size_mb = out_file.stat().st_size / (1024 * 1024)
         self.stdout.write(self.style.SUCCESS(f"Backup creado ({size_mb:.2f} MB)."))
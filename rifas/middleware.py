@@ -45,3 +45,19 @@ class AdminForcePasswordChangeMiddleware:
 
         return self.get_response(request)
 
+
+
+class DeferredEmailMiddleware:
+    """
+    Emails queued while handling a request are handed to the sender threads together
+    once the response is finished (request_finished), not while the view is running.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        from .emails import defer_sends
+
+        defer_sends()
+        return self.get_response(request)
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+def backfill_sold_tickets(apps, schema_editor):
+    Raffle = apps.get_model("rifas", "Raffle")
+    counts = Raffle.objects.annotate(n=models.Count("tickets")).values_list("pk", "n")
+    for pk, n in counts.iterator(chunk_size=2000):
+        Raffle.objects.filter(pk=pk).update(sold_tickets_cached=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rifas', '0022_raffle_idx_raffle_active_draw_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='raffle',
+            name='sold_tickets_cached',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_sold_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-15 10:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rifas', '0023_raffle_sold_tickets_cached'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketpurchase',
+            name='phone_prefix',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Substr('phone', 1, 3), output_field=models.CharField(max_length=3)),
+        ),
+        migrations.AddIndex(
+            model_name='ticketpurchase',
+            index=models.Index(fields=['phone_prefix'], name='idx_purchase_phone_prefix'),
+        ),
+    ]
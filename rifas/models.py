@@ -1,4 +1,5 @@
-from django.db import models, transaction
+from django.db import DatabaseError, models, transaction
+from django.db.models.functions import Coalesce, Substr
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from django.utils.text import slugify
@@ -186,6 +187,10 @@ class Raffle(models.Model):
         help_text="Opcional. Observación de la entrega (ej: fecha, lugar).",
     )
     is_active = models.BooleanField(default=True)
+    # Denormalized ticket count for admin lists: incremented by ticket generation and
+    # recounted on commit whenever a ticket is saved one by one or deleted (signals.py).
+    # Business rules (capacity, sold out) still count Ticket rows.
+    sold_tickets_cached = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -213,8 +218,50 @@ class Raffle(models.Model):
         # If admin marks raffle inactive and finished_at is not set, store timestamp.
         if self.pk and not self.is_active and self.finished_at is None:
             self.finished_at = timezone.now()
+        # Full saves (admin form) must not overwrite the ticket counter with a stale value.
+        # Only when it's loaded: deferred fields (.only()/.defer()) are skipped by Django anyway.
+        deferred = self.get_deferred_fields()
+        if (
+            self.pk
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and "sold_tickets_cached" not in deferred
+        ):
+            fields = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "sold_tickets_cached" and f.attname not in deferred
+            ]
+            try:
+                super().save(*args, update_fields=fields, **kwargs)
+                return
+            except DatabaseError as e:
+                # update_fields refuses to fall back to INSERT when the row is gone;
+                # keep Django's normal UPDATE-then-INSERT behavior for that case only.
+                if type(e) is not DatabaseError or "did not affect any rows" not in str(e):
+                    raise
         super().save(*args, **kwargs)
 
+    @classmethod
+    def refresh_sold_tickets(cls, raffle_ids) -> None:
+        """
+        Reset sold_tickets_cached to the real ticket count (one UPDATE for all raffles).
+        """
+        ids = [pk for pk in set(raffle_ids) if pk]
+        if not ids:
+            return
+        counts = (
+            Ticket.objects.filter(raffle=models.OuterRef("pk"))
+            .order_by()
+            .values("raffle")
+            .annotate(c=models.Count("pk"))
+            .values("c")
+        )
+        cls.objects.filter(pk__in=ids).update(
+            sold_tickets_cached=Coalesce(models.Subquery(counts), 0)
+        )
+
     @staticmethod
     def _is_video_name(name: str) -> bool:
         n = (name or "").lower()
@@ -295,11 +342,10 @@ class Raffle(models.Model):
 
     @property
     def sold_percent(self) -> int:
-        if not self.max_tickets:
-            return 0
-        if self.max_tickets <= 0:
+        if not self.max_tickets or self.max_tickets <= 0:
             return 0
-        return min(100, int((self.sold_tickets / self.max_tickets) * 100))
+        # Integer math: no float round-off (29/100*100 == 28.999...).
+        return min(100, self.sold_tickets * 100 // self.max_tickets)
 
     @property
     def is_sold_out(self) -> bool:
@@ -322,12 +368,11 @@ class Raffle(models.Model):
         """
         Returns the best active offer for this raffle (highest bonus).
         """
-        now = timezone.now()
-        qs = self.offers.filter(is_active=True).filter(
-            models.Q(starts_at__isnull=True) | models.Q(starts_at__lte=now),
-            models.Q(ends_at__isnull=True) | models.Q(ends_at__gte=now),
-        )
-        return qs.order_by("-bonus_quantity", "-buy_quantity", "-created_at").first()
+        # Use prefetched offers (if present) to avoid N+1 queries in lists.
+        prefetched = getattr(self, "active_offers_prefetch", None)
+        if prefetched is not None:
+            return prefetched[0] if prefetched else None
+        return RaffleOffer.active_queryset().filter(raffle=self).first()
 
 
 class TicketPurchase(models.Model):
@@ -339,6 +384,12 @@ class TicketPurchase(models.Model):
     raffle = models.ForeignKey(Raffle, on_delete=models.PROTECT, related_name="purchases")
     full_name = models.CharField(max_length=200)
     phone = models.CharField(max_length=40, db_index=True)
+    # First 3 digits (809/829/849), computed by the DB; indexed for the admin prefix filter.
+    phone_prefix = models.GeneratedField(
+        expression=Substr("phone", 1, 3),
+        output_field=models.CharField(max_length=3),
+        db_persist=True,
+    )
     email = models.EmailField(blank=True)
     bank_account = models.ForeignKey(
         "BankAccount",
@@ -373,6 +424,7 @@ class TicketPurchase(models.Model):
         indexes = [
             models.Index(fields=["raffle", "phone"], name="idx_purchase_raffle_phone"),
             models.Index(fields=["status", "created_at"], name="idx_purchase_status_created"),
+            models.Index(fields=["phone_prefix"], name="idx_purchase_phone_prefix"),
         ]
 
     def __str__(self) -> str:
@@ -400,38 +452,43 @@ class TicketPurchase(models.Model):
         """
         if self.status != self.Status.APPROVED:
             return
+        # Cheap pre-check without locks; recounted below once the locks are held.
         if self.tickets.count() >= self.total_tickets:
             return
 
         with transaction.atomic():
+            # Lock this purchase (serializes concurrent approvals of it even when the raffle
+            # has no tickets yet) and the raffle tickets (no duplicate numbers, MySQL/InnoDB).
+            list(TicketPurchase.objects.select_for_update().filter(pk=self.pk).values_list("pk", flat=True))
+            last = (
+                Ticket.objects.select_for_update()
+                .filter(raffle=self.raffle)
+                .order_by("-number")
+                .first()
+            )
+            needed = max(0, self.total_tickets - self.tickets.count())
+            if not needed:
+                return
+
             # Validate capacity
             if self.raffle.max_tickets:
                 remaining = self.raffle.max_tickets - self.raffle.tickets.count()
                 if remaining <= 0:
                     raise ValueError("No quedan boletos disponibles para esta rifa.")
-                if (self.total_tickets - self.tickets.count()) > remaining:
+                if needed > remaining:
                     raise ValueError("No hay suficientes boletos disponibles para completar esta compra.")
 
-            # Lock raffle tickets to avoid duplicate numbers under concurrency (MySQL/InnoDB).
-            last = (
-                Ticket.objects.select_for_update()
-                .filter(raffle=self.raffle)
-                .order_by("-number")
-                .first()
-            )
             start = (last.number if last else 0) + 1
-            to_create = []
-            existing = self.tickets.count()
-            needed = max(0, self.total_tickets - existing)
-            for i in range(needed):
-                to_create.append(
-                    Ticket(
-                        raffle=self.raffle,
-                        purchase=self,
-                        number=start + i,
-                    )
-                )
-            Ticket.objects.bulk_create(to_create)
+            to_create = [
+                Ticket(raffle=self.raffle, purchase=self, number=start + i)
+                for i in range(needed)
+            ]
+            # No ignore_conflicts: a number clash must fail loudly, not drop tickets.
+            Ticket.objects.bulk_create(to_create, batch_size=1000)
+            Raffle.objects.filter(pk=self.raffle_id).update(
+                sold_tickets_cached=models.F("sold_tickets_cached") + len(to_create)
+            )
+            self.raffle.sold_tickets_cached = int(self.raffle.sold_tickets_cached or 0) + len(to_create)
             # If this approval completes the raffle, close it.
             self.raffle.close_if_sold_out()
 
@@ -461,12 +518,131 @@ class TicketPurchase(models.Model):
         )
         self.generate_tickets_if_needed()
 
+    @classmethod
+    def bulk_approve(cls, purchases, notes: str = "") -> tuple[list["TicketPurchase"], list[tuple["TicketPurchase", str]]]:
+        """
+        Approve many purchases with batched writes (admin bulk action):
+        one bulk_update for the purchases, one bulk_create for their tickets and
+        one counter UPDATE per raffle, instead of several queries per purchase.
+
+        Same rules as approve(): offer applied, capacity validated, sequential numbers.
+        Returns (approved, failed); failed purchases are left untouched so the
+        caller can reject them with the error message.
+        """
+        purchases = list(purchases)
+        approved: list[TicketPurchase] = []
+        failed: list[tuple[TicketPurchase, str]] = []
+        if not purchases:
+            return approved, failed
+
+        by_raffle: dict[int, list[TicketPurchase]] = {}
+        for p in purchases:
+            by_raffle.setdefault(p.raffle_id, []).append(p)
+
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the selected purchases first: a concurrent approval of the same
+            # rows waits here and then sees the tickets created by this one.
+            list(cls.objects.select_for_update().filter(pk__in=[p.pk for p in purchases]).values_list("pk", flat=True))
+            existing = dict(
+                Ticket.objects.filter(purchase__in=purchases)
+                .values("purchase_id")
+                .annotate(n=models.Count("id"))
+                .values_list("purchase_id", "n")
+            )
+            to_create: list[Ticket] = []
+            touched_raffles: list[Raffle] = []
+            for raffle_id, group in by_raffle.items():
+                raffle = group[0].raffle
+                offer = raffle.get_active_offer()
+                # Lock raffle tickets to avoid duplicate numbers under concurrency (MySQL/InnoDB).
+                last = Ticket.objects.select_for_update().filter(raffle_id=raffle_id).order_by("-number").first()
+                next_number = (last.number if last else 0) + 1
+                issued = Ticket.objects.filter(raffle_id=raffle_id).count() if raffle.max_tickets else 0
+                created_for_raffle = 0
+                for p in group:
+                    bonus = offer.bonus_for(p.quantity) if offer else 0
+                    total = int(p.quantity or 0) + int(bonus or 0)
+                    needed = max(0, total - existing.get(p.pk, 0))
+                    if needed and raffle.max_tickets:
+                        remaining = raffle.max_tickets - issued
+                        if remaining <= 0:
+                            failed.append((p, "No quedan boletos disponibles para esta rifa."))
+                            continue
+                        if needed > remaining:
+                            failed.append((p, "No hay suficientes boletos disponibles para completar esta compra."))
+                            continue
+                    p.bonus_quantity = bonus
+                    p.total_tickets = total
+                    p.total_amount = int(raffle.price_per_ticket or 0) * int(p.quantity or 0)
+                    if not p.public_reference:
+                        p.public_reference = cls._generate_reference()
+                    p.status = cls.Status.APPROVED
+                    p.admin_notes = notes
+                    p.decided_at = now
+                    to_create.extend(Ticket(raffle=raffle, purchase=p, number=next_number + i) for i in range(needed))
+                    next_number += needed
+                    issued += needed
+                    created_for_raffle += needed
+                    approved.append(p)
+                if created_for_raffle:
+                    Raffle.objects.filter(pk=raffle_id).update(
+                        sold_tickets_cached=models.F("sold_tickets_cached") + created_for_raffle
+                    )
+                    raffle.sold_tickets_cached = int(raffle.sold_tickets_cached or 0) + created_for_raffle
+                    touched_raffles.append(raffle)
+
+            cls.objects.bulk_update(
+                approved,
+                ["status", "admin_notes", "decided_at", "total_amount", "public_reference", "bonus_quantity", "total_tickets"],
+                batch_size=500,
+            )
+            Ticket.objects.bulk_create(to_create, batch_size=1000)
+            # If these approvals complete a raffle, close it.
+            for raffle in touched_raffles:
+                raffle.close_if_sold_out()
+
+        cls._sync_customers(approved)
+        return approved, failed
+
     def reject(self, notes: str = ""):
         self.status = self.Status.REJECTED
         self.admin_notes = notes
         self.decided_at = timezone.now()
         self.save(update_fields=["status", "admin_notes", "decided_at"])
 
+    @classmethod
+    def bulk_reject(cls, purchases, notes: str | list[str] = "") -> list["TicketPurchase"]:
+        """
+        reject() for many purchases with a single bulk_update.
+        notes: one note for all, or one per purchase (same order).
+        """
+        purchases = list(purchases)
+        if not purchases:
+            return purchases
+        per_row = notes if isinstance(notes, list) else [notes] * len(purchases)
+        now = timezone.now()
+        for p, note in zip(purchases, per_row):
+            p.status = cls.Status.REJECTED
+            p.admin_notes = note or ""
+            p.decided_at = now
+        cls.objects.bulk_update(purchases, ["status", "admin_notes", "decided_at"], batch_size=500)
+        cls._sync_customers(purchases)
+        return purchases
+
+    @staticmethod
+    def _sync_customers(purchases) -> None:
+        # bulk_update skips post_save: keep Customers in sync (once per phone).
+        synced: set[str] = set()
+        for p in purchases:
+            if p.phone in synced:
+                continue
+            synced.add(p.phone)
+            try:
+                Customer.upsert_from_purchase(p)
+            except Exception:
+                pass
+
 
 class Customer(models.Model):
     """
@@ -746,10 +922,17 @@ class Ticket(models.Model):
             max_tickets = int(getattr(self.raffle, "max_tickets", 0) or 0)
         except Exception:
             max_tickets = 0
+        return self.format_number(self.number, max_tickets)
+
+    @staticmethod
+    def format_number(number: int, max_tickets: int | None) -> str:
+        """
+        display_number for a bare number (e.g. from values_list) without loading Ticket/Raffle.
+        """
         width = max(3, len(str(max_tickets))) if max_tickets else 0
         if width:
-            return f"{int(self.number):0{width}d}"
-        return str(self.number)
+            return f"{int(number):0{width}d}"
+        return str(number)
 
 
 class AuditEvent(models.Model):
@@ -924,6 +1107,22 @@ class RaffleOffer(models.Model):
     def __str__(self) -> str:
         return f"{self.raffle.title}: compra {self.buy_quantity} y recibe {self.bonus_quantity}"
 
+    @classmethod
+    def active_queryset(cls, now=None):
+        """
+        Offers currently in effect, best first (highest bonus).
+        Shared by Raffle.get_active_offer and admin prefetches.
+        """
+        now = now or timezone.now()
+        return (
+            cls.objects.filter(is_active=True)
+            .filter(
+                models.Q(starts_at__isnull=True) | models.Q(starts_at__lte=now),
+                models.Q(ends_at__isnull=True) | models.Q(ends_at__gte=now),
+            )
+            .order_by("-bonus_quantity", "-buy_quantity", "-created_at")
+        )
+
     def bonus_for(self, paid_qty: int) -> int:
         paid_qty = int(paid_qty or 0)
         if paid_qty <= 0:
@@ -0,0 +1,121 @@
+"""
+Payment proofs are stored as uploaded and recompressed afterwards on a background
+thread, so the purchase POST doesn't wait for JPEG encoding.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.core.files.base import ContentFile
+from django.db import connections
+
+from .models import TicketPurchase
+
+
+logger = logging.getLogger(__name__)
+
+# Proofs above this are recompressed (same target the form used to apply inline).
+TARGET_MAX_BYTES = 500 * 1024
+# JPEG encoding is CPU-bound: a couple of long-lived workers per process, and a bounded
+# backlog (past it, proofs are kept as uploaded instead of piling up threads).
+_WORKERS = 2
+MAX_PENDING = 20
+
+_jobs: queue.Queue = queue.Queue(maxsize=MAX_PENDING)
+_lock = threading.Lock()
+_threads: list[threading.Thread] = []
+
+
+def _needs_optimizing(purchase: TicketPurchase) -> bool:
+    f = purchase.proof_image
+    try:
+        return bool(f and getattr(f, "name", "")) and (f.size or 0) > TARGET_MAX_BYTES
+    except Exception:
+        return False
+
+
+def _optimize_stored_proof(purchase: TicketPurchase) -> None:
+    from .forms import _optimize_image_upload
+
+    f = purchase.proof_image
+    old_name = f.name
+    with f.open("rb") as fh:
+        optimized = _optimize_image_upload(fh, target_max_bytes=TARGET_MAX_BYTES)
+    f.save(os.path.basename(optimized.name), ContentFile(optimized.read()), save=False)
+    # Only the file column: don't overwrite anything an admin changed meanwhile.
+    TicketPurchase.objects.filter(pk=purchase.pk).update(proof_image=f.name)
+    if old_name != f.name:
+        try:
+            f.storage.delete(old_name)
+        except Exception:
+            pass
+
+
+def _finish(purchase: TicketPurchase, on_done) -> None:
+    if on_done is None:
+        return
+    try:
+        on_done()
+    except Exception as e:
+        logger.warning("Proof follow-up failed (purchase %s): %s", purchase.pk, e)
+
+
+def _run() -> None:
+    while True:
+        purchase, on_done = _jobs.get()
+        try:
+            _optimize_stored_proof(purchase)
+        except Exception as e:
+            logger.warning("Proof optimization failed (purchase %s): %s", purchase.pk, e)
+        finally:
+            # The admin notification must go out whatever happened to the optimization.
+            _finish(purchase, on_done)
+            connections.close_all()
+            _jobs.task_done()
+
+
+def _ensure_threads() -> None:
+    if len(_threads) >= _WORKERS and all(t.is_alive() for t in _threads):
+        return
+    with _lock:
+        _threads[:] = [t for t in _threads if t.is_alive()]
+        while len(_threads) < _WORKERS:
+            t = threading.Thread(target=_run, name="proof-optimizer", daemon=True)
+            t.start()
+            _threads.append(t)
+
+
+def optimize_proof_background(purchase: TicketPurchase, *, on_done=None) -> None:
+    """
+    Recompress purchase.proof_image off the request; on_done() always runs afterwards
+    (also when optimizing failed or was skipped and the original is kept).
+    """
+    if not _needs_optimizing(purchase):
+        # Already small: nothing to queue, just continue.
+        _finish(purchase, on_done)
+        return
+    _ensure_threads()
+    try:
+        _jobs.put_nowait((purchase, on_done))
+    except queue.Full:
+        logger.warning("Proof optimization backlog full; keeping purchase %s proof as uploaded.", purchase.pk)
+        _finish(purchase, on_done)
+
+
+def _notify_pending_on_exit() -> None:
+    # Worker recycled with proofs still queued: skip their optimization, not their notification.
+    while True:
+        try:
+            purchase, on_done = _jobs.get_nowait()
+        except queue.Empty:
+            return
+        _finish(purchase, on_done)
+        _jobs.task_done()
+
+
+atexit.register(_notify_pending_on_exit)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import threading
+
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Customer, TicketPurchase, UserSecurity
+from .context_processors import bump_site_content_version
+from .models import Customer, Raffle, SiteContent, Ticket, TicketPurchase, UserSecurity
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -22,3 +26,57 @@ def sync_customer_from_purchase(sender, instance: TicketPurchase, created, **kwa
         # Don't break purchases if customer sync fails.
         pass
 
+
+
+# Raffles whose ticket count changed in this thread's transaction; recounted on commit.
+_recount = threading.local()
+
+
+def _flush_sold_ticket_recounts():
+    ids = getattr(_recount, "raffle_ids", None)
+    _recount.raffle_ids = set()
+    if ids:
+        Raffle.refresh_sold_tickets(ids)
+
+
+def _recount_sold_tickets_later(raffle_id) -> None:
+    ids = getattr(_recount, "raffle_ids", None)
+    if ids is None:
+        ids = _recount.raffle_ids = set()
+    ids.add(raffle_id)
+    # Later callbacks in the same commit find the set empty (cheap no-ops). Ids left
+    # over from a rolled-back transaction just get recounted on the next commit.
+    transaction.on_commit(_flush_sold_ticket_recounts)
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_raffle(sender, instance: Ticket, **kwargs):
+    # Edits can move a ticket to another raffle: the old one must be recounted too.
+    instance._previous_raffle_id = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_raffle_id = (
+            Ticket.objects.filter(pk=instance.pk).values_list("raffle_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def track_saved_ticket(sender, instance: Ticket, created, **kwargs):
+    # bulk_create (ticket generation) sends no post_save and increments the counter itself.
+    _recount_sold_tickets_later(instance.raffle_id)
+    previous = getattr(instance, "_previous_raffle_id", None)
+    if previous and previous != instance.raffle_id:
+        _recount_sold_tickets_later(previous)
+
+
+@receiver(post_delete, sender=Ticket)
+def track_deleted_ticket(sender, instance: Ticket, **kwargs):
+    # Also fires per ticket for cascade/bulk deletes: one recount per raffle on commit,
+    # not one UPDATE per ticket.
+    _recount_sold_tickets_later(instance.raffle_id)
+
+
+@receiver(post_save, sender=SiteContent)
+@receiver(post_delete, sender=SiteContent)
+def invalidate_site_content(sender, instance: SiteContent, **kwargs):
+    # After commit, so other processes don't reload the old row.
+    transaction.on_commit(bump_site_content_version)
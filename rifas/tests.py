@@ -1,3 +1,224 @@
+import io
+import struct
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .audit_worker import _write
+from .models import AuditEvent, Customer, Raffle, Ticket, TicketPurchase
+from .video_transcode import mp4_duration_seconds
+
+
+def make_raffle(**kwargs) -> Raffle:
+    data = {
+        "title": "Rifa de prueba",
+        "draw_date": timezone.now() + timedelta(days=7),
+        "price_per_ticket": 100,
+    }
+    data.update(kwargs)
+    return Raffle.objects.create(**data)
+
+
+def make_purchase(raffle: Raffle, *, quantity: int = 2, phone: str = "8095550001", **kwargs) -> TicketPurchase:
+    data = {
+        "raffle": raffle,
+        "full_name": "Cliente Prueba",
+        "phone": phone,
+        "quantity": quantity,
+        "total_amount": 0,
+        "proof_image": "payments/proof.jpg",
+    }
+    data.update(kwargs)
+    return TicketPurchase.objects.create(**data)
+
+
+class SoldTicketsCounterTests(TestCase):
+    def assertCounterMatches(self, raffle: Raffle):
+        raffle.refresh_from_db(fields=["sold_tickets_cached"])
+        self.assertEqual(raffle.sold_tickets_cached, raffle.tickets.count())
+
+    def test_generate_delete_and_reapprove(self):
+        raffle = make_raffle()
+        first = make_purchase(raffle, quantity=3)
+        second = make_purchase(raffle, quantity=2, phone="8095550002")
+
+        first.approve()
+        second.approve()
+        self.assertEqual(raffle.tickets.count(), 5)
+        self.assertCounterMatches(raffle)
+
+        # Cascade-deleting the tickets recounts once the transaction commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(raffle.tickets.count(), 2)
+        self.assertCounterMatches(raffle)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.tickets.all().delete()
+        self.assertCounterMatches(raffle)
+
+        # Re-approving regenerates the missing tickets after the last number.
+        second.refresh_from_db()
+        second.approve()
+        self.assertEqual(second.tickets.count(), 2)
+        self.assertCounterMatches(raffle)
+
+    def test_generate_is_idempotent(self):
+        raffle = make_raffle()
+        purchase = make_purchase(raffle, quantity=2)
+        purchase.approve()
+        purchase.generate_tickets_if_needed()
+        self.assertEqual(purchase.tickets.count(), 2)
+        self.assertCounterMatches(raffle)
+
+    def test_single_ticket_save_and_move(self):
+        raffle = make_raffle()
+        other = make_raffle(title="Otra rifa")
+        purchase = make_purchase(raffle, quantity=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(raffle=raffle, purchase=purchase, number=1)
+        self.assertCounterMatches(raffle)
+
+        # Moving a ticket recounts both the old and the new raffle.
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.raffle = other
+            ticket.save()
+        self.assertCounterMatches(raffle)
+        self.assertCounterMatches(other)
+
+    def test_raffle_save_keeps_counter(self):
+        raffle = make_raffle()
+        purchase = make_purchase(raffle, quantity=2)
+        stale = Raffle.objects.get(pk=raffle.pk)
+        purchase.approve()
+
+        # Saving a copy loaded before the tickets existed must not reset the counter.
+        stale.title = "Nuevo título"
+        stale.save()
+        self.assertCounterMatches(raffle)
+
+        deferred = Raffle.objects.defer("description").get(pk=raffle.pk)
+        deferred.title = "Otro título"
+        deferred.save()
+        self.assertCounterMatches(raffle)
+
+    def test_refresh_sold_tickets_repairs_drift(self):
+        raffle = make_raffle()
+        make_purchase(raffle, quantity=2).approve()
+        Raffle.objects.filter(pk=raffle.pk).update(sold_tickets_cached=99)
+        Raffle.refresh_sold_tickets([raffle.pk])
+        self.assertCounterMatches(raffle)
+
+    def test_sold_out_closes_raffle(self):
+        raffle = make_raffle(max_tickets=2)
+        make_purchase(raffle, quantity=2).approve()
+        raffle.refresh_from_db()
+        self.assertFalse(raffle.is_active)
+        self.assertIsNotNone(raffle.finished_at)
+        with self.assertRaises(ValueError):
+            make_purchase(raffle, quantity=1, phone="8095550002").approve()
+
+
+class BulkApproveTests(TestCase):
+    def test_skips_tickets_already_issued(self):
+        raffle = make_raffle()
+        done = make_purchase(raffle, quantity=2)
+        done.approve()
+        pending = [
+            make_purchase(raffle, quantity=1, phone="8095550002"),
+            make_purchase(raffle, quantity=3, phone="8095550003"),
+        ]
+
+        approved, failed = TicketPurchase.bulk_approve([done, *pending], notes="ok")
+
+        self.assertEqual(failed, [])
+        self.assertEqual(len(approved), 3)
+        self.assertEqual(done.tickets.count(), 2)
+        self.assertEqual([p.tickets.count() for p in pending], [1, 3])
+        numbers = list(raffle.tickets.order_by("number").values_list("number", flat=True))
+        self.assertEqual(numbers, list(range(1, 7)))
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.sold_tickets_cached, 6)
+        for p in pending:
+            p.refresh_from_db()
+            self.assertEqual(p.status, TicketPurchase.Status.APPROVED)
+            self.assertEqual(p.total_amount, 100 * p.quantity)
+            self.assertIsNotNone(p.decided_at)
+
+    def test_reports_purchases_over_capacity(self):
+        raffle = make_raffle(max_tickets=3)
+        fits = make_purchase(raffle, quantity=2)
+        too_many = make_purchase(raffle, quantity=2, phone="8095550002")
+
+        approved, failed = TicketPurchase.bulk_approve([fits, too_many])
+
+        self.assertEqual(approved, [fits])
+        self.assertEqual([p for p, _msg in failed], [too_many])
+        too_many.refresh_from_db()
+        self.assertEqual(too_many.status, TicketPurchase.Status.PENDING)
+        self.assertEqual(too_many.tickets.count(), 0)
+        raffle.refresh_from_db()
+        self.assertEqual(raffle.sold_tickets_cached, 2)
+
+
+class BulkRejectTests(TestCase):
+    def test_per_row_notes_and_customer_sync(self):
+        raffle = make_raffle()
+        a = make_purchase(raffle, quantity=1, phone="8095550001")
+        b = make_purchase(raffle, quantity=4, phone="8095550001")
+        c = make_purchase(raffle, quantity=2, phone="8095550002")
+        Customer.objects.all().delete()
+
+        TicketPurchase.bulk_reject([a, b, c], notes=["uno", "dos", "tres"])
+
+        self.assertEqual(
+            list(TicketPurchase.objects.order_by("pk").values_list("status", "admin_notes")),
+            [(TicketPurchase.Status.REJECTED, n) for n in ("uno", "dos", "tres")],
+        )
+        # One Customer per phone, aggregates recomputed from all its purchases.
+        self.assertEqual(Customer.objects.count(), 2)
+        customer = Customer.objects.get(phone="8095550001")
+        self.assertEqual(customer.total_purchases, 2)
+        self.assertEqual(customer.total_paid_tickets, 5)
+
+
+class AuditWriterTests(TestCase):
+    def test_batch_keeps_events_with_deleted_refs(self):
+        raffle = make_raffle()
+        purchase = make_purchase(raffle)
+        gone = make_purchase(raffle, phone="8095550002")
+        gone_pk = gone.pk
+        events = [
+            AuditEvent(action=AuditEvent.Action.PURCHASE_APPROVED, raffle=raffle, purchase=purchase),
+            AuditEvent(action=AuditEvent.Action.PURCHASE_DELETED, raffle=raffle, purchase=gone),
+        ]
+        gone.delete()
+
+        _write(events)
+
+        self.assertEqual(AuditEvent.objects.count(), 2)
+        deleted = AuditEvent.objects.get(action=AuditEvent.Action.PURCHASE_DELETED)
+        self.assertIsNone(deleted.purchase_id)
+        self.assertEqual(deleted.extra.get("purchase_id"), gone_pk)
+
+
+def _box(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+
+class Mp4DurationTests(TestCase):
+    def test_reads_mvhd_v0(self):
+        mvhd = _box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">8xII", 1000, 12500) + b"\x00" * 80)
+        data = _box(b"ftyp", b"isom\x00\x00\x02\x00") + _box(b"mdat", b"\x00" * 64) + _box(b"moov", mvhd)
+        self.assertEqual(mp4_duration_seconds(io.BytesIO(data)), 12.5)
+
+    def test_reads_mvhd_v1(self):
+        mvhd = _box(b"mvhd", b"\x01\x00\x00\x00" + struct.pack(">16xIQ", 600, 1800) + b"\x00" * 80)
+        data = _box(b"ftyp", b"isom") + _box(b"moov", mvhd)
+        self.assertEqual(mp4_duration_seconds(io.BytesIO(data)), 3.0)
 
-# Create your tests here.
+    def test_not_mp4(self):
+        self.assertIsNone(mp4_duration_seconds(io.BytesIO(b"\x1a\x45\xdf\xa3" + b"\x00" * 60)))
+        self.assertIsNone(mp4_duration_seconds(io.BytesIO(b"")))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import shutil
+import struct
 import subprocess
 import tempfile
 from typing import Optional
@@ -14,6 +15,97 @@ def ffmpeg_available() -> bool:
     return bool(shutil.which("ffmpeg"))
 
 
+# Top-level box types a real MP4/MOV can start with.
+_MP4_FIRST_BOXES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide"}
+
+
+def _iter_mp4_boxes(f, start: int, end: Optional[int]):
+    """
+    Yield (type, body_start, body_end) for the ISO-BMFF boxes in [start, end).
+    Only box headers are read; bodies are skipped with seek().
+    """
+    pos = start
+    while end is None or pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        header_len = 8
+        if size == 1:
+            ext = f.read(8)
+            if len(ext) < 8:
+                return
+            size = struct.unpack(">Q", ext)[0]
+            header_len = 16
+        elif size == 0:
+            # Box extends to the end of its parent (or of the file).
+            yield kind, pos + header_len, end
+            return
+        if size < header_len:
+            return
+        yield kind, pos + header_len, pos + size
+        pos += size
+
+
+def mp4_duration_seconds(f) -> Optional[float]:
+    """
+    Duration of an MP4/MOV file read from its moov/mvhd header (a few box headers,
+    not the whole file). Returns None when the header can't be found so callers can
+    fall back to a full metadata parser.
+    """
+    try:
+        for i, (kind, body, end) in enumerate(_iter_mp4_boxes(f, 0, None)):
+            if i == 0 and kind not in _MP4_FIRST_BOXES:
+                return None
+            if kind != b"moov":
+                continue
+            for child, child_body, _child_end in _iter_mp4_boxes(f, body, end):
+                if child != b"mvhd":
+                    continue
+                f.seek(child_body)
+                version = f.read(4)[:1]
+                if version == b"\x01":
+                    timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                else:
+                    timescale, duration = struct.unpack(">8xII", f.read(16))
+                if not timescale:
+                    return None
+                return duration / timescale
+            return None
+    except (OSError, ValueError, struct.error):
+        return None
+    return None
+
+
+def ffprobe_duration_seconds(f, timeout_seconds: int = 5) -> Optional[float]:
+    """
+    Container duration via ffprobe, which reads only the metadata (WebM/MKV and
+    anything the MP4 header reader can't handle). None if ffprobe isn't installed
+    or can't tell.
+    """
+    if not shutil.which("ffprobe"):
+        return None
+    cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1"]
+    try:
+        # Large uploads are already on disk (TemporaryUploadedFile); small ones go through stdin.
+        path = f.temporary_file_path() if hasattr(f, "temporary_file_path") else None
+        if path:
+            res = subprocess.run(cmd + [path], capture_output=True, timeout=timeout_seconds)
+        else:
+            f.seek(0)
+            res = subprocess.run(cmd + ["pipe:0"], input=f.read(), capture_output=True, timeout=timeout_seconds)
+        length = float(res.stdout.strip() or 0)
+    except Exception:
+        return None
+    finally:
+        try:
+            f.seek(0)
+        except Exception:
+            pass
+    return length or None
+
+
 def should_transcode_to_mp4(uploaded) -> bool:
     """
     Return True for uploads we want to normalize to MP4 (H.264) for maximum compatibility.
@@ -27,6 +27,7 @@ from .forms import (
 )
 from .emails import send_customer_purchase_received, send_purchase_notification
 from .models import BankAccount, Raffle, SiteContent, Ticket, TicketPurchase, UserSecurity
+from .proof_images import optimize_proof_background
 
 
 PUBLIC_PAGE_CACHE_SECONDS = 60
@@ -142,7 +143,11 @@ def buy_ticket(request, slug: str):
                 request.session["purchase_tokens"] = tokens
             # Emails must NEVER block or break purchases (SMTP may be blocked in hosting).
             try:
-                send_purchase_notification(request=request, purchase=purchase)
+                # Admin email goes out once the proof is recompressed (small attachment/link).
+                optimize_proof_background(
+                    purchase,
+                    on_done=lambda: send_purchase_notification(request=request, purchase=purchase),
+                )
             except Exception:
                 pass
             try: